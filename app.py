@@ -1,22 +1,44 @@
 """Flask application entry point for the Student Database v2.0."""
 
 import os
+import atexit
+import importlib
 import logging
+import weakref
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from flask import Flask
-from flask_migrate import Migrate
-from flask_cors import CORS
-from dotenv import load_dotenv
+from queue import SimpleQueue
+from flask import Flask, current_app
 
 # Import your custom modules
 from config.settings import config
 from extensions import db
 
+# Apps whose buffered last_login values are flushed at exit. One atexit hook
+# serves them all, and the weak set lets apps built by tests or smoke checks
+# be collected instead of living until the process exits
+_apps_flushed_at_exit = weakref.WeakSet()
+
+@lru_cache(maxsize=1)
+def _env_file_values():
+    """Parse .env once per process; repeated create_app() calls reuse it."""
+    from dotenv import dotenv_values
+    return dotenv_values()
+
+def load_env_file():
+    """Apply .env values without overriding variables already set."""
+    for key, value in _env_file_values().items():
+        if value is not None and key not in os.environ:
+            os.environ[key] = value
+
 def create_app(config_name=None):
     """Application factory pattern for better organization."""
 
-    # Load environment variables from .env if present
-    load_dotenv()
+    # Load environment variables from .env if present (skipped under pytest
+    # or when FLASK_SKIP_DOTENV=1 so test runs don't pick up local settings)
+    if os.environ.get('FLASK_SKIP_DOTENV') != '1' and not os.environ.get('PYTEST_CURRENT_TEST'):
+        load_env_file()
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
@@ -43,10 +65,37 @@ def create_app(config_name=None):
     else:
         print("🔒 AUTH_DISABLED is OFF - normal auth required")
     
+    # Serialize responses with orjson when available
+    from utils.json_provider import ORJSON_AVAILABLE, OrjsonProvider
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    
     # Initialize extensions
     db.init_app(app)
-    Migrate(app, db)
-    CORS(app)  # Enable CORS for frontend
+    
+    # Alembic is only needed for `flask db ...`; tests skip the import entirely
+    if app.config.get('ENABLE_MIGRATIONS', not app.testing):
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    
+    if app.config.get('CORS_ENABLED', True):
+        setup_cors(app)  # Enable CORS for frontend
+    
+    # Verify the Bearer token once per request into g.current_user
+    from auth.decorators import load_current_user
+    app.before_request(load_current_user)
+    
+    # Write buffered last_login values at the end of any request once the
+    # flush interval has passed, and on shutdown
+    app.teardown_request(_flush_last_logins_after_request)
+    if app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 30):
+        _apps_flushed_at_exit.add(app)
+    
+    # Register every model with the metadata (models/__init__ loads lazily)
+    try:
+        importlib.import_module('models._registry')
+    except ImportError as e:
+        print(f"Warning: Could not import all models: {e}")
     
     # Register blueprints (after ensuring they exist)
     try:
@@ -61,16 +110,10 @@ def create_app(config_name=None):
     # Setup error handlers
     setup_error_handlers(app)
     
-    # Create database tables - but only if we're not in the reloader process
-    if not os.environ.get('WERKZEUG_RUN_MAIN'):
+    # Create database tables - unless AUTO_CREATE_TABLES is turned off, and
+    # not in the reloader process
+    if app.config.get('AUTO_CREATE_TABLES') and not os.environ.get('WERKZEUG_RUN_MAIN'):
         with app.app_context():
-            # Import models to ensure they're registered
-            try:
-                import models  # noqa: F401
-                print("Models imported successfully")
-            except ImportError as e:
-                print(f"Warning: Could not import all models: {e}")
-            
             # Create all database tables
             try:
                 db.create_all()
@@ -80,27 +123,79 @@ def create_app(config_name=None):
                 # Don't raise here, let the app continue
             
             # Initialize default data if needed
-            initialize_default_data()
+            if not app.config.get('SKIP_INIT_CHECK'):
+                initialize_default_data()
     
     return app
 
+def _flush_last_logins_after_request(exc):
+    """Flush buffered last_login updates if the flush interval has passed."""
+    from auth.models import flush_last_logins
+    try:
+        flush_last_logins()
+    except Exception as e:
+        current_app.logger.warning(f'Could not flush last_login updates: {e}')
+
+@atexit.register
+def _flush_last_logins_at_exit():
+    """Flush each live app's buffered last_login updates before the process exits."""
+    from auth.models import flush_last_logins
+    for app in list(_apps_flushed_at_exit):
+        try:
+            with app.app_context():
+                flush_last_logins(force=True)
+        except Exception as e:
+            print(f"Could not flush last_login updates: {e}")
+
+def setup_cors(app):
+    """Configure CORS and answer preflight requests without view dispatch."""
+    from flask import request
+    from flask_cors import CORS
+
+    # Built once here so flask-cors doesn't re-derive the list per request
+    allowed = frozenset(app.config.get('CORS_ORIGINS') or ())
+    CORS(
+        app,
+        origins=sorted(allowed) or '*',
+        max_age=app.config.get('CORS_MAX_AGE', 86400),
+        send_wildcard=False,
+    )
+
+    @app.before_request
+    def short_circuit_preflight():
+        # flask-cors adds the Access-Control-* headers in after_request
+        if request.method == 'OPTIONS' and request.routing_exception is None:
+            return app.make_default_options_response()
+
 def setup_logging(app):
     """Configure logging."""
     if not app.debug:
-        # Setup file logging for production
+        # Setup file logging for production. Request threads only enqueue
+        # records; a background QueueListener owns the file handler.
         log_dir = Path(app.instance_path) / 'logs'
         log_dir.mkdir(exist_ok=True)
         
-        handler = logging.FileHandler(log_dir / 'app.log')
-        handler.setLevel(logging.INFO)
+        file_handler = RotatingFileHandler(
+            log_dir / 'app.log',
+            maxBytes=10 * 1024 * 1024,  # 10MB
+            backupCount=10
+        )
+        file_handler.setLevel(logging.INFO)
         
         formatter = logging.Formatter(
             '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
         )
-        handler.setFormatter(formatter)
+        file_handler.setFormatter(formatter)
         
-        app.logger.addHandler(handler)
+        log_queue = SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        app.extensions['log_listener'] = listener
+        
+        app.logger.addHandler(QueueHandler(log_queue))
         app.logger.setLevel(logging.INFO)
+        app.logger.info('Student Database startup')
 
 def setup_error_handlers(app):
     """Setup error handling."""
@@ -118,8 +213,10 @@ def initialize_default_data():
     """Initialize default data if database is empty."""
     # Check if we need to create default data
     try:
+        from sqlalchemy import exists, select
         from models import User
-        if User.query.first() is not None:
+        # SELECT EXISTS(...) avoids loading and hydrating a full user row
+        if db.session.execute(select(exists().where(User.id.is_not(None)))).scalar():
             return
         print("Database is empty, run scripts/create_admin.py to create admin user")
     except Exception as e:
@@ -129,16 +226,21 @@ def initialize_default_data():
 app = create_app()
 
 if __name__ == '__main__':
-    # Development server - disable reloader to avoid SQLite conflicts
+    # Development server. The reloader is safe with SQLite because the
+    # WERKZEUG_RUN_MAIN guard in create_app keeps the child process from
+    # creating tables again; set DISABLE_RELOADER=1 to turn it off.
+    use_reloader = app.debug and not os.environ.get('DISABLE_RELOADER')
     print("🚀 Starting Student Database v2.0...")
     print("📍 Server will be available at: http://127.0.0.1:5000")
     print("📍 API Health check: http://127.0.0.1:5000/api/v1/health")
-    print("⚠️  Debug reloader disabled to avoid SQLite conflicts")
+    if not use_reloader:
+        print("⚠️  Debug reloader disabled")
     
     app.run(
         debug=True, 
         host='127.0.0.1', 
         port=5000,
-        use_reloader=False  # This fixes the SQLite conflict
+        use_reloader=use_reloader,
+        reloader_type='watchdog',  # inotify/kqueue instead of stat-polling every module
+        reloader_interval=2,
     )
-    
@@ -21,6 +21,30 @@ def _dev_user():
             return True
     return _Stub()
 
+def _call_as_dev_user(f, *args, **kwargs):
+    """Run ``f`` with a dev ``g.current_user`` and no auth checks."""
+    if g.get('current_user') is None:
+        g.current_user = _dev_user()
+    return f(*args, **kwargs)
+
+def _get_bearer_token() -> str | None:
+    """Extract a Bearer token from the Authorization header, or None."""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    return auth_header.split(' ', 1)[1].strip()
+
+def load_current_user():
+    """``before_request`` hook: verify the Bearer token once per request.
+
+    Sets ``g.current_user`` to the verified user, or to ``None`` when a
+    token was sent but is invalid. Without a token ``g.current_user`` is
+    left unset so decorators can tell the two cases apart.
+    """
+    token = _get_bearer_token()
+    if token:
+        g.current_user = User.verify_token(token)
+
 def require_auth(f):
     """Decorator to require authentication."""
     
@@ -28,22 +52,15 @@ def require_auth(f):
     def decorated_function(*args, **kwargs):
         # Bypass auth in dev mode
         if current_app.config.get("AUTH_DISABLED"):
-            if not hasattr(g, 'current_user'):
-                g.current_user = _dev_user()
-            return f(*args, **kwargs)
+            return _call_as_dev_user(f, *args, **kwargs)
 
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header or not auth_header.startswith('Bearer '):
+        # g.current_user is populated by load_current_user()
+        if 'current_user' not in g:
             return jsonify({'error': 'Authentication required'}), 401
         
-        token = auth_header.split(' ')[1]
-        user = User.verify_token(token)
-        
-        if not user:
+        if g.current_user is None:
             return jsonify({'error': 'Invalid or expired token'}), 401
         
-        g.current_user = user
         return f(*args, **kwargs)
     
     return decorated_function
@@ -56,11 +73,9 @@ def require_permission(permission):
         def decorated_function(*args, **kwargs):
             # Bypass permission checks in dev mode
             if current_app.config.get("AUTH_DISABLED"):
-                if not hasattr(g, 'current_user'):
-                    g.current_user = _dev_user()
-                return f(*args, **kwargs)
+                return _call_as_dev_user(f, *args, **kwargs)
 
-            if not hasattr(g, 'current_user'):
+            if g.get('current_user') is None:
                 return jsonify({'error': 'Authentication required'}), 401
             
             if not g.current_user.has_permission(permission):
@@ -79,11 +94,9 @@ def require_role(role):
         def decorated_function(*args, **kwargs):
             # Bypass role checks in dev mode
             if current_app.config.get("AUTH_DISABLED"):
-                if not hasattr(g, 'current_user'):
-                    g.current_user = _dev_user()
-                return f(*args, **kwargs)
+                return _call_as_dev_user(f, *args, **kwargs)
 
-            if not hasattr(g, 'current_user'):
+            if g.get('current_user') is None:
                 return jsonify({'error': 'Authentication required'}), 401
             
             if g.current_user.role != role:
@@ -105,7 +118,11 @@ def role_required(roles):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not hasattr(g, 'current_user'):
+            # Bypass role checks in dev mode
+            if current_app.config.get("AUTH_DISABLED"):
+                return _call_as_dev_user(f, *args, **kwargs)
+
+            if g.get('current_user') is None:
                 return jsonify({'error': 'Authentication required'}), 401
             
             if g.current_user.role not in roles:
@@ -1,19 +1,91 @@
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
-from werkzeug.security import generate_password_hash, check_password_hash
+from functools import lru_cache
+from werkzeug.security import check_password_hash
 import jwt
-from flask import current_app
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import current_app, g, has_app_context
+from sqlalchemy import case, update
 
 # Import db from extensions
 from extensions import db
+from models.serialization import SerializeMixin
+from models.sql import utcnow
 
-class User(db.Model):
+_JWT_ALGORITHM = "HS256"
+_JWT_ALGORITHMS = (_JWT_ALGORITHM,)
+# Every token we issue carries these; anything without them is not ours
+_JWT_DECODE_OPTIONS = {"require": ["exp", "iat", "type"]}
+
+_ARGON2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+def _hash_password(password):
+    return _ARGON2.hash(password)
+
+def _verify_password(password_hash, password):
+    """Check ``password`` against an argon2 or legacy Werkzeug hash."""
+    if password_hash.startswith('$argon2'):
+        try:
+            return _ARGON2.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+def _needs_rehash(password_hash):
+    """True for Werkzeug hashes or argon2 hashes with outdated parameters."""
+    if not password_hash.startswith('$argon2'):
+        return True
+    return _ARGON2.check_needs_rehash(password_hash)
+
+_ROLE_PERMISSIONS = {
+    'admin': frozenset({'read', 'write', 'delete', 'admin'}),
+    'clinician': frozenset({'read', 'write'}),
+    'intern': frozenset({'read'}),
+    'viewer': frozenset({'read'}),
+}
+_NO_PERMISSIONS = frozenset()
+
+@lru_cache(maxsize=4096)
+def _decode_token(token, secret):
+    """Verify a token's signature and claims once per distinct token.
+
+    Raises ``jwt.InvalidTokenError`` for bad tokens (exceptions are not
+    cached). The returned payload is shared between callers; treat it as
+    read-only.
+    """
+    return jwt.decode(token, secret, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+
+def _jwt_secret():
+    """Signing key for access and refresh tokens."""
+    config = current_app.config
+    return config.get('JWT_SECRET_KEY') or config['SECRET_KEY']
+
+class _LoginBuffer:
+    """Successful logins waiting for flush_last_logins() to write them in one
+    UPDATE per flush interval instead of one UPDATE per login."""
+
+    def __init__(self):
+        self.pending: dict[int, datetime] = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+def _login_buffer():
+    """The current app's buffer; each app writes only to its own database."""
+    return current_app.extensions.setdefault('last_login_buffer', _LoginBuffer())
+
+class User(db.Model, SerializeMixin):
     """User model for authentication and authorization."""
     
     __tablename__ = 'users'
+    _DICT_FIELDS = ('id', 'username', 'first_name', 'last_name', 'role', 'active',
+                    'email_verified')
     
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    username = db.Column(db.String(80), unique=True, index=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     
     # Profile information
@@ -32,17 +104,34 @@ class User(db.Model):
     password_changed_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Audit trail
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow(), onupdate=utcnow())
     
     def set_password(self, password):
         """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _hash_password(password)
         self.password_changed_at = datetime.utcnow()
     
     def check_password(self, password):
-        """Check password against hash."""
-        return check_password_hash(self.password_hash, password)
+        """Check password against hash, memoized for the current request.
+
+        A correct password stored under an older scheme is rehashed with
+        argon2; the caller's commit persists the new hash.
+        """
+        if not has_app_context():
+            result = _verify_password(self.password_hash, password)
+        else:
+            # Keyed on the stored hash, so a password change never sees a stale result
+            checked = g.setdefault('_password_checks', {})
+            key = (self.password_hash, hashlib.sha256(password.encode('utf-8')).digest())
+            result = checked.get(key)
+            if result is None:
+                result = checked[key] = _verify_password(self.password_hash, password)
+        if result and _needs_rehash(self.password_hash):
+            # Not set_password: the password itself is unchanged, so issued
+            # tokens stay valid
+            self.password_hash = _hash_password(password)
+        return result
     
     def is_locked(self):
         """Check if account is locked due to failed attempts."""
@@ -60,6 +149,12 @@ class User(db.Model):
         self.locked_until = None
         self.failed_login_attempts = 0
     
+    def record_login(self):
+        """Buffer a successful login; see :func:`flush_last_logins`."""
+        buffer = _login_buffer()
+        with buffer.lock:
+            buffer.pending[self.id] = datetime.utcnow()
+    
     def generate_access_token(self, expires_delta=None):
         """Generate JWT access token."""
         if expires_delta is None:
@@ -76,8 +171,8 @@ class User(db.Model):
         
         return jwt.encode(
             payload,
-            current_app.config['SECRET_KEY'],
-            algorithm='HS256'
+            _jwt_secret(),
+            algorithm=_JWT_ALGORITHM
         )
     
     def generate_refresh_token(self):
@@ -91,8 +186,8 @@ class User(db.Model):
         
         return jwt.encode(
             payload,
-            current_app.config['SECRET_KEY'],
-            algorithm='HS256'
+            _jwt_secret(),
+            algorithm=_JWT_ALGORITHM
         )
     
     @staticmethod
@@ -100,59 +195,40 @@ class User(db.Model):
         """Decode an access token and return the associated active user.
 
         The token's signature and expiration are validated using the
-        application's ``SECRET_KEY``. Only tokens explicitly marked as access
+        application's ``JWT_SECRET_KEY``. Only tokens explicitly marked as access
         tokens are accepted. If the token is invalid, expired or the user is
         inactive, ``None`` is returned.
         """
-        try:
-            payload = jwt.decode(
-                token,
-                current_app.config["SECRET_KEY"],
-                algorithms=["HS256"],
-            )
-        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, KeyError, TypeError):
-            return None
-
-        if payload.get("type") != "access":
-            return None
-
-        user_id = payload.get("user_id")
-        user = User.query.get(user_id) if user_id is not None else None
-        if not user or not user.active:
-            return None
-
-        # Invalidate tokens issued before the most recent password change
-        iat = payload.get("iat")
-        if iat is not None and user.password_changed_at is not None:
-            if isinstance(iat, (int, float)):
-                issued_at = datetime.utcfromtimestamp(iat)
-            else:
-                issued_at = iat
-            if issued_at < user.password_changed_at:
-                return None
-
-        return user
+        return User._user_from_token(token, "access")
 
     @staticmethod
     def verify_refresh_token(refresh_token: str) -> "User | None":
         """Validate a refresh token and return the associated active user."""
+        return User._user_from_token(refresh_token, "refresh")
+
+    @staticmethod
+    def _user_from_token(token: str, token_type: str) -> "User | None":
+        """Shared verification for access and refresh tokens."""
         try:
-            payload = jwt.decode(
-                refresh_token,
-                current_app.config["SECRET_KEY"],
-                algorithms=["HS256"],
-            )
-        except (jwt.ExpiredSignatureError, jwt.InvalidTokenError, KeyError, TypeError):
+            payload = _decode_token(token, _jwt_secret())
+        except (jwt.InvalidTokenError, KeyError, TypeError):
             return None
 
-        if payload.get("type") != "refresh":
+        # Decoded payloads are cached, so expiry has to be re-checked here
+        exp = payload.get("exp")
+        if exp is not None and exp < time.time():
+            return None
+
+        if payload.get("type") != token_type:
             return None
 
         user_id = payload.get("user_id")
-        user = User.query.get(user_id) if user_id is not None else None
+        # session.get answers from the identity map when the user is already loaded
+        user = db.session.get(User, user_id) if user_id is not None else None
         if not user or not user.active:
             return None
 
+        # Invalidate tokens issued before the most recent password change
         iat = payload.get("iat")
         if iat is not None and user.password_changed_at is not None:
             if isinstance(iat, (int, float)):
@@ -166,27 +242,16 @@ class User(db.Model):
     
     def has_permission(self, permission):
         """Check if user has specific permission."""
-        role_permissions = {
-            'admin': ['read', 'write', 'delete', 'admin'],
-            'clinician': ['read', 'write'],
-            'intern': ['read'],
-            'viewer': ['read']
-        }
-        
-        return permission in role_permissions.get(self.role, [])
+        return permission in _ROLE_PERMISSIONS.get(self.role, _NO_PERMISSIONS)
     
     def to_dict(self, include_sensitive=False):
         """Convert to dictionary."""
-        data = {
-            'id': self.id,
-            'username': self.username,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'role': self.role,
-            'active': self.active,
-            'email_verified': self.email_verified,
-            'last_login': self.last_login.isoformat() if self.last_login else None
-        }
+        # Prefer a buffered login that hasn't been flushed yet
+        last_login = self.last_login
+        if has_app_context():
+            last_login = _login_buffer().pending.get(self.id) or last_login
+        data = self._columns_dict()
+        data['last_login'] = last_login.isoformat() if last_login else None
         
         if include_sensitive:
             data.update({
@@ -196,3 +261,39 @@ class User(db.Model):
             })
             
         return data
+
+
+def flush_last_logins(force=False):
+    """Write buffered ``last_login`` values in a single UPDATE.
+
+    Does nothing until ``LAST_LOGIN_FLUSH_INTERVAL`` seconds have passed
+    since the previous flush unless ``force`` is set. Returns the number
+    of users written.
+    """
+    buffer = _login_buffer()
+    interval = current_app.config.get('LAST_LOGIN_FLUSH_INTERVAL', 30)
+    now = time.monotonic()
+    with buffer.lock:
+        if not buffer.pending or (not force and now - buffer.last_flush < interval):
+            return 0
+        pending = dict(buffer.pending)
+        buffer.pending.clear()
+        buffer.last_flush = now
+
+    # Own transaction, so a flush from a request hook never commits (or rolls
+    # back) whatever the request's session still holds
+    table = User.__table__
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where(table.c.id.in_(pending))
+                .values(last_login=case(pending, value=table.c.id))
+            )
+    except Exception:
+        # Put the values back for the next flush; newer logins win
+        with buffer.lock:
+            for user_id, last_login in pending.items():
+                buffer.pending.setdefault(user_id, last_login)
+        raise
+    return len(pending)
@@ -3,9 +3,12 @@ Branch health check with scoring for the Student Database repo.
 Run: python check_branch.py
 """
 
-import os
+import functools
+import io
+import py_compile
 import subprocess
-import sys
+from concurrent.futures import ThreadPoolExecutor
+from shutil import which
 from typing import Tuple, Optional
 
 # Weights (sum to 100)
@@ -17,9 +20,9 @@ WEIGHTS = {
     "lint_tests": 10,    # optional ruff/pytest (if installed)
 }
 
-def run(cmd, desc=None, check=True) -> Tuple[bool, str]:
+def run(cmd, desc=None, check=True, log=print) -> Tuple[bool, str]:
     if desc:
-        print(f"\n== {desc} ==")
+        log(f"\n== {desc} ==")
     try:
         p = subprocess.run(
             cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
@@ -27,21 +30,52 @@ def run(cmd, desc=None, check=True) -> Tuple[bool, str]:
         )
         out = (p.stdout or "").strip()
         if out:
-            print(out)
+            log(out)
         return True, out
     except subprocess.CalledProcessError as e:
-        print("Command failed:", " ".join(cmd))
-        print(e.stdout or "")
+        log("Command failed:", " ".join(cmd))
+        log(e.stdout or "")
         return False, e.stdout or ""
 
+# Paths never scanned for SQLAlchemy() (this script and local virtualenvs)
+SCAN_EXCLUDES = ("check_branch.py", ".venv/", "venv/", "env/")
+
+@functools.cache
+def repo_files() -> frozenset:
+    """Tracked + untracked (non-ignored) files from one `git ls-files` call."""
+    try:
+        p = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return frozenset()
+    return frozenset(f for f in p.stdout.decode("utf-8", "replace").split("\0") if f)
+
+def git_python_files() -> list[str]:
+    return sorted(f for f in repo_files() if f.endswith(".py"))
+
 def py_compile_all() -> bool:
-    ok, files = run(["git", "ls-files", "*.py"], "Gather Python files", check=False)
-    py_files = (files or "").split()
+    print("\n== Gather Python files ==")
+    py_files = git_python_files()
     if not py_files:
         print("No Python files found.")
         return False
-    ok, _ = run([sys.executable, "-m", "py_compile", *py_files], "Python compile check", check=False)
-    return ok
+    print(f"{len(py_files)} files")
+
+    # Compile in-process instead of spawning `python -m py_compile`
+    print("\n== Python compile check ==")
+    failures = []
+    for path in py_files:
+        try:
+            py_compile.compile(path, doraise=True)
+        except py_compile.PyCompileError as e:
+            failures.append(e.msg)
+        except OSError as e:
+            failures.append(f"{path}: {e}")
+    for msg in failures:
+        print(msg)
+    return not failures
 
 def import_factory():
     print("\n== App factory check ==")
@@ -57,24 +91,31 @@ def import_factory():
 
 def sqlalchemy_count_ok() -> tuple[bool, int]:
     print("\n== SQLAlchemy instance check ==")
-    # Exclude this script and common virtualenv dirs
-    ok, out = run(
-        ["git","grep","-n","SQLAlchemy(","--",
-         ":!check_branch.py",":!.venv",":!venv",":!env",":!**/.git/*"],
-        check=False
-    )
-    lines = (out or "").splitlines()
-    count = len([line for line in lines if line.strip()])
-    for line in lines:
-        print(line)
+    # Read each Python file once instead of forking `git grep`
+    count = 0
+    for path in git_python_files():
+        if path.startswith(SCAN_EXCLUDES):
+            continue
+        try:
+            with open(path, encoding="utf-8", errors="replace") as fh:
+                text = fh.read()
+        except OSError:
+            continue
+        if "SQLAlchemy(" not in text:
+            continue
+        for lineno, line in enumerate(text.splitlines(), 1):
+            if "SQLAlchemy(" in line:
+                count += 1
+                print(f"{path}:{lineno}:{line}")
     print(f"Found {count} SQLAlchemy() calls (excluding helper files)")
     return (count == 1, count)
 
 def stray_files_ok() -> bool:
     print("\n== Stray files check ==")
+    files = repo_files()
     bad = False
     for fname in ["models.py", "routes.py"]:
-        if os.path.exists(fname):
+        if fname in files:
             bad = True
             print(f"❌ Found stray {fname}")
         else:
@@ -98,45 +139,65 @@ def health_smoke_ok(app) -> bool:
         print("Skipping health checks: no app")
         return False
     print("\n== Health endpoint check ==")
+    from werkzeug.test import EnvironBuilder
+
     ok_all = True
     paths = ["/health", "/api/v1/health", "/auth/health"]
-    with app.test_client() as c:
-        for p in paths:
+    # Build the WSGI environ once and only swap PATH_INFO per request
+    base_environ = EnvironBuilder(method="GET").get_environ()
+    status = []
+
+    def start_response(status_line, headers, exc_info=None):
+        status.append(status_line)
+
+    for p in paths:
+        try:
+            body = app.wsgi_app(dict(base_environ, PATH_INFO=p), start_response)
             try:
-                r = c.get(p)
-                print(p, r.status_code)
-                # 200 is ideal; 404 is acceptable if route doesn't exist.
-                # Mark as OK if no exception thrown.
-            except Exception as e:
-                ok_all = False
-                print(p, "ERR", e)
+                for _ in body:
+                    pass
+            finally:
+                if hasattr(body, "close"):
+                    body.close()
+            print(p, status[-1].split(" ", 1)[0])
+            # 200 is ideal; 404 is acceptable if route doesn't exist.
+            # Mark as OK if no exception thrown.
+        except Exception as e:
+            ok_all = False
+            print(p, "ERR", e)
     return ok_all
 
-def ruff_unused_count() -> Optional[int]:
-    print("\n== Lint (ruff) unused imports (optional) ==")
-    if not shutil_which("ruff"):
-        print("ruff not installed; skipping")
+def ruff_unused_count(available: bool, log=print) -> Optional[int]:
+    log("\n== Lint (ruff) unused imports (optional) ==")
+    if not available:
+        log("ruff not installed; skipping")
         return None
-    ok, out = run(["ruff", "check", "--select", "F401", "."], check=False)
+    ok, out = run(["ruff", "check", "--select", "F401", "."], check=False, log=log)
     # Each finding is a line; empty output = 0
     count = 0
     for line in (out or "").splitlines():
         if line.strip() and ":" in line:
             count += 1
-    print(f"Unused import findings: {count}")
+    log(f"Unused import findings: {count}")
     return count
 
-def pytest_ok() -> Optional[bool]:
-    print("\n== Tests (pytest) (optional) ==")
-    if not shutil_which("pytest"):
-        print("pytest not installed; skipping")
+def pytest_ok(available: bool, log=print) -> Optional[bool]:
+    log("\n== Tests (pytest) (optional) ==")
+    if not available:
+        log("pytest not installed; skipping")
         return None
-    ok, _ = run(["pytest", "-q"], check=False)
-    print("pytest:", "OK" if ok else "FAIL")
+    ok, _ = run(["pytest", "-q"], check=False, log=log)
+    log("pytest:", "OK" if ok else "FAIL")
     return ok
 
+def buffered(fn, *args):
+    """Run fn with its log output captured; returns (result, output)."""
+    buf = io.StringIO()
+    result = fn(*args, log=lambda *a: print(*a, file=buf))
+    return result, buf.getvalue()
+
+@functools.cache
 def shutil_which(name: str) -> bool:
-    from shutil import which
     return which(name) is not None
 
 def score_section(passed: bool, weight: int) -> int:
@@ -145,6 +206,17 @@ def score_section(passed: bool, weight: int) -> int:
 def main():
     print("=== Branch Health Check (with scoring) ===")
 
+    # Resolve optional tools once up front
+    has_ruff = shutil_which("ruff")
+    has_pytest = shutil_which("pytest")
+
+    # ruff and pytest are independent subprocesses: start them now and let
+    # them run while the in-process checks below execute. Their output is
+    # buffered and printed afterwards so sections don't interleave.
+    pool = ThreadPoolExecutor(max_workers=2)
+    ruff_future = pool.submit(buffered, ruff_unused_count, has_ruff)
+    pytest_future = pool.submit(buffered, pytest_ok, has_pytest)
+
     # Compile + factory import
     compile_ok = py_compile_all()
     app = import_factory()
@@ -168,8 +240,11 @@ def main():
 
     # Optional: ruff + pytest (partial credit if either passes)
     lint_points = 0
-    ruff_count = ruff_unused_count()
-    tests_ok = pytest_ok()
+    ruff_count, ruff_log = ruff_future.result()
+    print(ruff_log, end="")
+    tests_ok, pytest_log = pytest_future.result()
+    print(pytest_log, end="")
+    pool.shutdown()
 
     # Scoring rule:
     # - If pytest is present and passes => full lint_tests points
@@ -3,15 +3,40 @@ import secrets
 from datetime import timedelta
 from pathlib import Path
 
+from sqlalchemy.pool import StaticPool
+
 # Base directory
 BASE_DIR = Path(__file__).parent.parent.absolute()
 
+# Secrets that must come from the environment in production: (config key, random bytes)
+SECRET_FALLBACKS = (
+    ('SECRET_KEY', 32),
+    ('SECURITY_PASSWORD_SALT', 16),
+    ('JWT_SECRET_KEY', 32),
+)
+
+def _read_secrets_from_env(app):
+    """Fill unset secrets from ``os.environ`` at init time.
+
+    app.py imports this module before create_app() loads .env, so the class
+    attributes below only see variables exported before startup.
+    """
+    for key, _ in SECRET_FALLBACKS:
+        app.config[key] = app.config.get(key) or os.environ.get(key)
+
+def _production_database_url():
+    url = os.environ.get('DATABASE_URL')
+    if url and url.startswith('postgres://'):
+        # Fix for SQLAlchemy compatibility
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url
+
 class Config:
     """Base configuration class."""
     
-    # Security settings
-    SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
-    SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT') or secrets.token_hex(16)
+    # Security settings (random per-process fallbacks are filled in by init_app)
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT')
     
     # Database configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
@@ -27,15 +52,31 @@ class Config:
     SESSION_COOKIE_SAMESITE = 'Lax'
     
     # JWT configuration
-    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or secrets.token_hex(32)
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Seconds between batched last_login writes (0 writes on every login)
+    LAST_LOGIN_FLUSH_INTERVAL = int(os.environ.get('LAST_LOGIN_FLUSH_INTERVAL', 30))
+    
     # Dev/auth toggle (handy during local development)
     # When set, auth decorators can bypass verification to speed up UI/dev work.
     # Enable with: export AUTH_DISABLED=1
     AUTH_DISABLED = os.environ.get('AUTH_DISABLED', '0') in ("1", "true", "True", "yes", "on")
     
+    # Run db.create_all() in create_app. On by default: migrations only carry
+    # changes to existing tables, so a fresh database still needs this. Set
+    # AUTO_CREATE_TABLES=false to skip the boot-time checks once tables exist
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'true').lower() == 'true'
+    # Skip the "is there a user yet?" probe that follows table creation
+    SKIP_INIT_CHECK = os.environ.get('SKIP_INIT_CHECK', 'false').lower() == 'true'
+    
+    # Optional extensions (Flask-Migrate defaults to off under TESTING)
+    CORS_ENABLED = os.environ.get('CORS_ENABLED', 'true').lower() == 'true'
+    # Comma-separated list of allowed origins; empty means any origin
+    CORS_ORIGINS = [o.strip() for o in os.environ.get('CORS_ORIGINS', '').split(',') if o.strip()]
+    CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', 86400))  # cache preflights for a day
+    
     # Privacy settings
     DATA_RETENTION_DAYS = int(os.environ.get('DATA_RETENTION_DAYS', 2555))  # 7 years
     ANONYMIZE_AFTER_DAYS = int(os.environ.get('ANONYMIZE_AFTER_DAYS', 365))  # 1 year
@@ -60,6 +101,13 @@ class Config:
     @staticmethod
     def init_app(app):
         """Initialize application with configuration."""
+        _read_secrets_from_env(app)
+        # Generate throwaway secrets only when none are configured; these
+        # change on every restart, invalidating sessions and tokens
+        for key, nbytes in SECRET_FALLBACKS:
+            if not app.config.get(key):
+                app.config[key] = secrets.token_hex(nbytes)
+        
         # Create instance folder if it doesn't exist
         instance_path = Path(app.instance_path)
         instance_path.mkdir(exist_ok=True)
@@ -105,8 +153,14 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     
-    # Use in-memory database for tests
+    # Use in-memory database for tests; StaticPool keeps a single connection
+    # so every session sees the tables created by create_app
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'connect_args': {'check_same_thread': False},
+        'poolclass': StaticPool,
+    }
+    AUTO_CREATE_TABLES = True
     
     # Disable CSRF for testing
     WTF_CSRF_ENABLED = False
@@ -114,6 +168,9 @@ class TestingConfig(Config):
     # Faster password hashing for tests
     BCRYPT_LOG_ROUNDS = 4
     
+    # Write last_login immediately so tests can assert on it
+    LAST_LOGIN_FLUSH_INTERVAL = 0
+    
     @staticmethod
     def init_app(app):
         """Testing-specific initialization."""
@@ -131,36 +188,33 @@ class ProductionConfig(Config):
     SESSION_COOKIE_SAMESITE = 'Strict'
     
     # Use PostgreSQL in production
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
-    if SQLALCHEMY_DATABASE_URI and SQLALCHEMY_DATABASE_URI.startswith('postgres://'):
-        # Fix for SQLAlchemy compatibility
-        SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace('postgres://', 'postgresql://', 1)
+    SQLALCHEMY_DATABASE_URI = _production_database_url()
+    
+    # Size the pool for a threaded server. Connections are recycled before
+    # typical server-side idle timeouts instead of pinging on every checkout;
+    # set DB_POOL_PRE_PING=true behind proxies/firewalls that drop idle
+    # connections sooner ("server closed the connection unexpectedly").
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 20)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': 1800,
+        'pool_pre_ping': os.environ.get('DB_POOL_PRE_PING', 'false').lower() == 'true',
+    }
     
     @staticmethod
     def init_app(app):
         """Production-specific initialization."""
+        # DATABASE_URL may also have come from .env after import
+        app.config['SQLALCHEMY_DATABASE_URI'] = (app.config.get('SQLALCHEMY_DATABASE_URI')
+                                                 or _production_database_url())
+        _read_secrets_from_env(app)
+        missing = [key for key, _ in SECRET_FALLBACKS if not app.config.get(key)]
+        if missing:
+            raise RuntimeError(f"Missing required production settings: {', '.join(missing)}")
         Config.init_app(app)
-        
-        # Log to file in production
-        import logging
-        from logging.handlers import RotatingFileHandler
-        
-        if not app.debug:
-            log_path = Path(app.instance_path) / 'logs'
-            log_path.mkdir(exist_ok=True)
-            
-            file_handler = RotatingFileHandler(
-                log_path / 'app.log',
-                maxBytes=10240000,  # 10MB
-                backupCount=10
-            )
-            file_handler.setFormatter(logging.Formatter(
-                '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-            ))
-            file_handler.setLevel(logging.INFO)
-            app.logger.addHandler(file_handler)
-            app.logger.setLevel(logging.INFO)
-            app.logger.info('Student Database startup')
+        # File logging is set up by app.setup_logging, which writes through a
+        # QueueHandler so request threads never block on the log file.
 
 # Configuration dictionary
 config = {
@@ -0,0 +1,39 @@
+"""Add objectives.recent_progress
+
+Tables have so far been created by db.create_all(), which never alters an
+existing table, so this revision only adds what is missing: databases
+created from the current models already have the column.
+
+Revision ID: 3f1c2a9d8b47
+Revises: 
+Create Date: 2026-10-16 07:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d8b47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return False
+    return column in {c['name'] for c in inspector.get_columns(table)}
+
+
+def upgrade():
+    if not _has_column('objectives', 'recent_progress'):
+        with op.batch_alter_table('objectives') as batch_op:
+            batch_op.add_column(sa.Column('recent_progress', sa.Float(), nullable=True))
+
+
+def downgrade():
+    if _has_column('objectives', 'recent_progress'):
+        with op.batch_alter_table('objectives') as batch_op:
+            batch_op.drop_column('recent_progress')
@@ -1,10 +1,19 @@
+import importlib
+
 from extensions import db
 
-# Import all models so they're available when importing from models
-from .student import Student, Goal, Objective
-from .session import Session, TrialLog
-from .soap import SOAPNote
-from auth.models import User
+# Models are imported on first attribute access (PEP 562) so that
+# ``from models import Student`` only pulls in the module that defines it.
+# ``models._registry`` imports everything at once for metadata/mapper setup.
+_LAZY = {
+    'Student': 'models.student',
+    'Goal': 'models.student',
+    'Objective': 'models.student',
+    'Session': 'models.session',
+    'TrialLog': 'models.session',
+    'SOAPNote': 'models.soap',
+    'User': 'auth.models',
+}
 
 __all__ = [
     'db',
@@ -17,3 +26,10 @@ __all__ = [
     'User',
 ]
 
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
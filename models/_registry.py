@@ -0,0 +1,9 @@
+"""Import every model module so ``db.metadata`` and the mapper registry are complete.
+
+Relationships are declared by class name (``'Session'``, ``'SOAPNote'``...),
+so all mapped classes must be imported before the first query configures
+the mappers or ``db.create_all()`` runs.
+"""
+
+from . import student, session, soap  # noqa: F401
+from auth import models as auth_models  # noqa: F401
@@ -1,8 +0,0 @@
-# models/auth.py
-"""
-This file previously contained a User model but has been moved to auth/models.py
-to avoid duplication. Import User from auth.models instead.
-"""
-
-# Import User from the auth package to maintain compatibility
-
@@ -0,0 +1,36 @@
+def _build_columns_dict(cls):
+    """Generate ``cls._columns_dict`` as a single dict display.
+
+    The key set is fixed per class, so instead of zipping names with values
+    at runtime we emit ``{'id': self.id, ..., 'created_at': <isoformat>}``
+    once and compile it, the way dataclasses generate ``__init__``.
+    """
+    items = []
+    for field in cls._DICT_FIELDS:
+        if not field.isidentifier():
+            raise ValueError(f"{cls.__name__}._DICT_FIELDS: invalid field name {field!r}")
+        if field in cls._ISO_FIELDS:
+            items.append(f"{field!r}: None if (v := self.{field}) is None else v.isoformat()")
+        else:
+            items.append(f"{field!r}: self.{field}")
+    source = "def _columns_dict(self):\n    return {" + ", ".join(items) + "}\n"
+    namespace = {}
+    exec(compile(source, f"<{cls.__name__}._columns_dict>", "exec"), namespace)
+    return namespace['_columns_dict']
+
+
+class SerializeMixin:
+    """Build the plain-column part of ``to_dict`` from a per-class field tuple.
+
+    Subclasses list the columns to emit in ``_DICT_FIELDS`` and the subset
+    rendered with ``isoformat()`` in ``_ISO_FIELDS``. ``_columns_dict`` is
+    generated for each subclass when it is defined.
+    """
+
+    _DICT_FIELDS = ()
+    _ISO_FIELDS = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls._DICT_FIELDS:
+            cls._columns_dict = _build_columns_dict(cls)
@@ -1,11 +1,24 @@
-from datetime import datetime, date
+from datetime import date, datetime, timedelta
+from sqlalchemy import bindparam, event, insert, inspect, select, update
+from sqlalchemy.orm import column_property, selectinload
 from sqlalchemy.ext.hybrid import hybrid_property
 from . import db
+from .serialization import SerializeMixin
+from .sql import minutes_between, utcnow
 
-class Session(db.Model):
+class Session(db.Model, SerializeMixin):
     """Session model for scheduling and tracking appointments."""
     
     __tablename__ = 'sessions'
+    __table_args__ = (
+        # Per-student schedules; date-range reports and the conflict/status
+        # filters on a given day share the session_date-leading index
+        db.Index('ix_session_student_date', 'student_id', 'session_date'),
+        db.Index('ix_session_date_status', 'session_date', 'status'),
+    )
+    _DICT_FIELDS = ('id', 'student_id', 'session_date', 'session_type', 'status', 'location',
+                    'notes', 'event_type', 'plan_notes', 'billing_code', 'units')
+    _ISO_FIELDS = frozenset({'session_date'})
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -26,56 +39,51 @@ class Session(db.Model):
     units = db.Column(db.Integer)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, onupdate=utcnow())
     
     # Relationships
     student = db.relationship('Student', back_populates='sessions')
     soap_notes = db.relationship('SOAPNote', back_populates='session', cascade='all, delete-orphan')
     
+    @classmethod
+    def query_with_student(cls):
+        """Query that loads each session's student in one extra SELECT."""
+        return cls.query.options(selectinload(cls.student))
+    
     @hybrid_property
     def duration_minutes(self):
         """Calculate session duration in minutes."""
-        if self.start_time and self.end_time:
-            start = datetime.combine(date.today(), self.start_time)
-            end = datetime.combine(date.today(), self.end_time)
-            return int((end - start).total_seconds() / 60)
+        start, end = self.start_time, self.end_time
+        if start and end:
+            # Plain integer arithmetic on the two times; no datetime objects
+            seconds = ((end.hour - start.hour) * 3600 + (end.minute - start.minute) * 60
+                       + (end.second - start.second) + (end.microsecond - start.microsecond) / 1e6)
+            return int(seconds / 60)
         return 0
     
+    @duration_minutes.expression
+    def duration_minutes(cls):
+        """SQL form of duration_minutes for filtering and aggregates."""
+        return minutes_between(cls.start_time, cls.end_time)
+    
     def to_dict(self):
         """Convert to dictionary."""
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'session_date': self.session_date.isoformat(),
-            'start_time': self.start_time.strftime('%H:%M') if self.start_time else None,
-            'end_time': self.end_time.strftime('%H:%M') if self.end_time else None,
-            'session_type': self.session_type,
-            'status': self.status,
-            'location': self.location,
-            'notes': self.notes,
-            'event_type': self.event_type,
-            'plan_notes': self.plan_notes,
-            'duration_minutes': self.duration_minutes,
-            'billing_code': self.billing_code,
-            'units': self.units
-        }
+        data = self._columns_dict()
+        data['start_time'] = self.start_time.strftime('%H:%M') if self.start_time else None
+        data['end_time'] = self.end_time.strftime('%H:%M') if self.end_time else None
+        data['duration_minutes'] = self.duration_minutes
+        return data
 
     def to_calendar_event(self):
         """Convert session to calendar event representation."""
-        start_dt = None
-        end_dt = None
-        if self.session_date and self.start_time:
-            start_dt = datetime.combine(self.session_date, self.start_time)
-        if self.session_date and self.end_time:
-            end_dt = datetime.combine(self.session_date, self.end_time)
-
+        day = self.session_date.isoformat() if self.session_date else None
         return {
             'id': self.id,
             'student_id': self.student_id,
             'title': self.student.display_name if self.student else f'Session {self.id}',
-            'start': start_dt.isoformat() if start_dt else None,
-            'end': end_dt.isoformat() if end_dt else None,
+            'start': day + 'T' + self.start_time.isoformat() if day and self.start_time else None,
+            'end': day + 'T' + self.end_time.isoformat() if day and self.end_time else None,
             'event_type': self.event_type,
             'session_type': self.session_type,
             'status': self.status,
@@ -83,15 +91,97 @@ class Session(db.Model):
             'notes': self.notes,
             'plan_notes': self.plan_notes,
         }
+    
+    @classmethod
+    def calendar_select(cls):
+        """Core SELECT of the columns calendar events need, with the title.
+
+        Add filters and ordering, execute it, and pass the rows to
+        ``calendar_events_from_rows``. No ORM instances are built.
+        """
+        from .student import Student
+        return select(
+            cls.id, cls.student_id, cls.session_date, cls.start_time, cls.end_time,
+            cls.event_type, cls.session_type, cls.status, cls.location, cls.notes,
+            cls.plan_notes, Student.display_name.label('title')
+        ).outerjoin(cls.student)
+    
+    @staticmethod
+    def calendar_events_from_rows(rows):
+        """Build ``to_calendar_event`` dicts from ``calendar_select`` rows."""
+        events = []
+        append = events.append
+        for (id_, student_id, session_date, start_time, end_time, event_type,
+             session_type, status, location, notes, plan_notes, title) in rows:
+            # date + 'T' + time is what datetime.combine(...).isoformat() gives
+            day = session_date.isoformat() if session_date else None
+            append({
+                'id': id_,
+                'student_id': student_id,
+                'title': title if title is not None else f'Session {id_}',
+                'start': day + 'T' + start_time.isoformat() if day and start_time else None,
+                'end': day + 'T' + end_time.isoformat() if day and end_time else None,
+                'event_type': event_type,
+                'session_type': session_type,
+                'status': status,
+                'location': location,
+                'notes': notes,
+                'plan_notes': plan_notes,
+            })
+        return events
+
+PROGRESS_WINDOW_DAYS = 30
+
+def _uses_new_system(log):
+    return bool(log.independent or log.minimal_support
+                or log.moderate_support or log.maximal_support)
+
+def _trial_counts(log):
+    """Return (total, independent, incorrect) for whichever system is in use.
 
-class TrialLog(db.Model):
+    ``log`` is a TrialLog or any row with the same count attributes.
+    """
+    if _uses_new_system(log):
+        incorrect = log.incorrect or 0
+        total = ((log.independent or 0)
+                 + (log.minimal_support or 0)
+                 + (log.moderate_support or 0)
+                 + (log.maximal_support or 0)
+                 + incorrect)
+        return total, log.independent, incorrect
+    incorrect = log.incorrect_legacy or 0
+    total = ((log.correct_no_support or 0)
+             + (log.correct_visual_cue or 0)
+             + (log.correct_verbal_cue or 0)
+             + (log.correct_visual_verbal_cue or 0)
+             + (log.correct_modeling or 0)
+             + incorrect)
+    return total, log.correct_no_support, incorrect
+
+def _percentages(total, independent, incorrect):
+    """Independence and success percentages from ``_trial_counts``."""
+    if total == 0:
+        return 0, 0
+    return round((independent / total) * 100, 1), round(((total - incorrect) / total) * 100, 1)
+
+class TrialLog(db.Model, SerializeMixin):
     """Trial log for tracking student progress."""
     
     __tablename__ = 'trial_logs'
+    __table_args__ = (
+        # Progress reports read one student's or one objective's logs by date
+        db.Index('ix_trial_student_date', 'student_id', 'session_date'),
+        db.Index('ix_trial_objective_date', 'objective_id', 'session_date'),
+    )
+    _DICT_FIELDS = ('id', 'student_id', 'objective_id', 'session_date', 'session_notes',
+                    'environmental_factors')
+    _ISO_FIELDS = frozenset({'session_date'})
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
-    objective_id = db.Column(db.Integer, db.ForeignKey('objectives.id'))
+    # active_history keeps the previous id even after a commit expired it
+    objective_id = column_property(db.Column(db.Integer, db.ForeignKey('objectives.id')),
+                                   active_history=True)
     session_date = db.Column(db.Date, default=date.today, nullable=False)
     
     # New support level system
@@ -114,81 +204,101 @@ class TrialLog(db.Model):
     environmental_factors = db.Column(db.String(200))
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, onupdate=utcnow())
     
     # Relationships
     student = db.relationship('Student', back_populates='trial_logs')
-    objective = db.relationship('Objective', back_populates='trial_logs')
+    # active_history keeps the previous objective so its progress can be refreshed
+    objective = db.relationship('Objective', back_populates='trial_logs', active_history=True)
+    
+    @classmethod
+    def bulk_create(cls, rows):
+        """Insert trial logs from dicts of column values in one executemany.
+
+        Skips per-object ORM bookkeeping, so no instances are returned or
+        added to the session. The caller commits.
+        """
+        if rows:
+            db.session.execute(insert(cls), rows)
+            # Bulk INSERT skips mapper events, so refresh progress here
+            cls.refresh_objective_progress({row.get('objective_id') for row in rows})
+        return len(rows)
+    
+    @classmethod
+    def refresh_objective_progress(cls, objective_ids, connection=None, days=PROGRESS_WINDOW_DAYS):
+        """Store each objective's average independence over its recent logs.
+
+        Writes ``Objective.recent_progress``, or NULL for objectives with no
+        logs in the window so reads fall back to ``current_progress``. Runs
+        on ``connection`` when called from a flush event, otherwise on the
+        session's connection; the caller commits. Returns how many objectives
+        had recent logs.
+        """
+        from .student import Objective
+        objective_ids = [i for i in objective_ids if i is not None]
+        if not objective_ids:
+            return 0
+        if connection is None:
+            connection = db.session.connection()
+        
+        cutoff = date.today() - timedelta(days=days)
+        rows = connection.execute(
+            select(cls.objective_id,
+                   cls.independent, cls.minimal_support, cls.moderate_support,
+                   cls.maximal_support, cls.incorrect,
+                   cls.correct_no_support, cls.correct_visual_cue, cls.correct_verbal_cue,
+                   cls.correct_visual_verbal_cue, cls.correct_modeling, cls.incorrect_legacy)
+            .where(cls.objective_id.in_(objective_ids), cls.session_date >= cutoff)
+        )
+        independence = {}
+        for row in rows:
+            independence.setdefault(row.objective_id, []).append(
+                _percentages(*_trial_counts(row))[0]
+            )
+        # Every requested id is written, so an objective whose last recent log
+        # was deleted or moved away drops back to NULL instead of going stale
+        progress = {objective_id: None for objective_id in objective_ids}
+        for objective_id, values in independence.items():
+            progress[objective_id] = round(sum(values) / len(values), 1)
+        connection.execute(
+            update(Objective.__table__)
+            .where(Objective.__table__.c.id == bindparam('objective_id'))
+            .values(recent_progress=bindparam('progress')),
+            [{'objective_id': objective_id, 'progress': value}
+             for objective_id, value in progress.items()]
+        )
+        return len(independence)
     
     @property
     def total_trials(self):
         """Calculate total number of trials."""
-        if self.uses_new_system():
-            return sum([
-                self.independent or 0,
-                self.minimal_support or 0,
-                self.moderate_support or 0,
-                self.maximal_support or 0,
-                self.incorrect or 0
-            ])
-        else:
-            return sum([
-                self.correct_no_support or 0,
-                self.correct_visual_cue or 0,
-                self.correct_verbal_cue or 0,
-                self.correct_visual_verbal_cue or 0,
-                self.correct_modeling or 0,
-                self.incorrect_legacy or 0
-            ])
+        return _trial_counts(self)[0]
     
     @property
     def independence_percentage(self):
         """Calculate independence percentage."""
-        total = self.total_trials
-        if total == 0:
-            return 0
-        
-        if self.uses_new_system():
-            return round((self.independent / total) * 100, 1)
-        else:
-            return round((self.correct_no_support / total) * 100, 1)
+        return _percentages(*_trial_counts(self))[0]
     
     @property
     def success_percentage(self):
         """Calculate success percentage."""
-        total = self.total_trials
-        if total == 0:
-            return 0
-        
-        if self.uses_new_system():
-            incorrect = self.incorrect or 0
-            return round(((total - incorrect) / total) * 100, 1)
-        else:
-            incorrect = self.incorrect_legacy or 0
-            return round(((total - incorrect) / total) * 100, 1)
+        return _percentages(*_trial_counts(self))[1]
     
     def uses_new_system(self):
         """Check if using new support system."""
-        return any([
-            self.independent,
-            self.minimal_support,
-            self.moderate_support,
-            self.maximal_support
-        ])
+        return _uses_new_system(self)
     
     def to_dict(self):
         """Convert to dictionary."""
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'objective_id': self.objective_id,
-            'session_date': self.session_date.isoformat(),
-            'total_trials': self.total_trials,
-            'independence_percentage': self.independence_percentage,
-            'success_percentage': self.success_percentage,
-            'session_notes': self.session_notes,
-            'environmental_factors': self.environmental_factors,
+        data = self._columns_dict()
+        # Count once and derive both percentages from the same numbers
+        counts = _trial_counts(self)
+        independence, success = _percentages(*counts)
+        data.update({
+            'total_trials': counts[0],
+            'independence_percentage': independence,
+            'success_percentage': success,
             'support_levels': {
                 'independent': self.independent,
                 'minimal_support': self.minimal_support,
@@ -196,4 +306,18 @@ class TrialLog(db.Model):
                 'maximal_support': self.maximal_support,
                 'incorrect': self.incorrect
             }
-        }
+        })
+        return data
+
+def _refresh_progress_after_write(mapper, connection, target):
+    """Keep Objective.recent_progress in step with single-row TrialLog writes."""
+    state = inspect(target)
+    objective_ids = {target.objective_id}
+    # A log moved to another objective also changes the one it left, whether
+    # it was moved by foreign key or through the relationship
+    objective_ids.update(state.attrs.objective_id.history.deleted)
+    objective_ids.update(obj.id for obj in state.attrs.objective.history.deleted if obj is not None)
+    TrialLog.refresh_objective_progress(objective_ids, connection)
+
+for _event in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(TrialLog, _event, _refresh_progress_after_write)
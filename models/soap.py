@@ -1,10 +1,21 @@
-from datetime import datetime, date
+from datetime import date, datetime
+from sqlalchemy import and_, case, or_, update
 from . import db
+from .serialization import SerializeMixin
+from .sql import utcnow
 
-class SOAPNote(db.Model):
+class SOAPNote(db.Model, SerializeMixin):
     """SOAP Note model for clinical documentation."""
     
     __tablename__ = 'soap_notes'
+    __table_args__ = (
+        # Student progress reports read notes by date; sessions look up their notes
+        db.Index('ix_soap_student_date', 'student_id', 'session_date'),
+        db.Index('ix_soap_session', 'session_id'),
+    )
+    _DICT_FIELDS = ('id', 'student_id', 'session_id', 'session_date', 'clinician_signature',
+                    'reviewed_by', 'reviewed_date', 'anonymized')
+    _ISO_FIELDS = frozenset({'session_date', 'reviewed_date'})
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -26,12 +37,14 @@ class SOAPNote(db.Model):
     anonymized = db.Column(db.Boolean, default=False)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, onupdate=utcnow())
     
     # Relationships
-    student = db.relationship('Student', back_populates='soap_notes')
-    session = db.relationship('Session', back_populates='soap_notes')
+    # Nothing reads these per note; a query that needs them must ask with
+    # selectinload() instead of lazy loading one row at a time
+    student = db.relationship('Student', back_populates='soap_notes', lazy='raise_on_sql')
+    session = db.relationship('Session', back_populates='soap_notes', lazy='raise_on_sql')
     
     def anonymize(self):
         """Anonymize SOAP note content."""
@@ -46,18 +59,40 @@ class SOAPNote(db.Model):
             self.plan = "ANONYMIZED CONTENT"
         self.clinician_signature = "ANONYMIZED"
     
+    @classmethod
+    def bulk_anonymize(cls, student_ids):
+        """Anonymize every not-yet-anonymized note of the given students.
+
+        Same result as calling ``anonymize()`` on each note, done in one
+        UPDATE. Returns the number of notes changed; the caller commits.
+        """
+        def masked(column):
+            # Like anonymize(): only non-empty content is replaced
+            return case(
+                (and_(column.is_not(None), column != ''), 'ANONYMIZED CONTENT'),
+                else_=column,
+            )
+        
+        result = db.session.execute(
+            update(cls)
+            # A restored note can carry anonymized=NULL; it is not anonymized yet
+            .where(cls.student_id.in_(student_ids),
+                   or_(cls.anonymized.is_(False), cls.anonymized.is_(None)))
+            .values(
+                anonymized=True,
+                subjective=masked(cls.subjective),
+                objective=masked(cls.objective),
+                assessment=masked(cls.assessment),
+                plan=masked(cls.plan),
+                clinician_signature='ANONYMIZED',
+            )
+            .execution_options(synchronize_session='fetch')
+        )
+        return result.rowcount
+    
     def to_dict(self, include_content=True):
         """Convert to dictionary."""
-        data = {
-            'id': self.id,
-            'student_id': self.student_id,
-            'session_id': self.session_id,
-            'session_date': self.session_date.isoformat(),
-            'clinician_signature': self.clinician_signature,
-            'reviewed_by': self.reviewed_by,
-            'reviewed_date': self.reviewed_date.isoformat() if self.reviewed_date else None,
-            'anonymized': self.anonymized
-        }
+        data = self._columns_dict()
         
         if include_content and not self.anonymized:
             data.update({
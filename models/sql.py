@@ -0,0 +1,44 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import DateTime, Integer
+
+
+class utcnow(FunctionElement):
+    """Server-side UTC timestamp, matching the naive ``datetime.utcnow`` values
+    already stored in the database."""
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+class minutes_between(FunctionElement):
+    """Whole minutes from one TIME expression to another, truncated toward
+    zero like ``int()`` in Python."""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(minutes_between)
+def _minutes_between_default(element, compiler, **kw):
+    # SQLite keeps TIME as text; strftime('%s') reads it as seconds on a
+    # fixed date, and integer division truncates toward zero
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"((strftime('%s', {end}) - strftime('%s', {start})) / 60)"
+
+
+@compiles(minutes_between, 'postgresql')
+def _minutes_between_postgresql(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"CAST(TRUNC(EXTRACT(EPOCH FROM ({end} - {start})) / 60) AS INTEGER)"
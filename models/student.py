@@ -1,13 +1,20 @@
-from datetime import datetime, date
+from datetime import datetime
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import selectinload, undefer
 from . import db
-import uuid
+from .serialization import SerializeMixin
+from .sql import utcnow
+from secrets import token_hex
 
 class AuditMixin:
     """Mixin for audit trail functionality."""
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # server_default only reaches tables created from this schema; the Python
+    # default keeps inserts working on databases that predate it, since
+    # create_all() never alters an existing table
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow(), onupdate=utcnow(), nullable=False)
 
 class PrivacyMixin:
     """Mixin for privacy and data protection features."""
@@ -21,10 +28,17 @@ class PrivacyMixin:
         self.anonymized = True
         self.anonymized_at = datetime.utcnow()
 
-class Student(db.Model, AuditMixin, PrivacyMixin):
+class Student(db.Model, AuditMixin, PrivacyMixin, SerializeMixin):
     """Student model with privacy protection."""
     
     __tablename__ = 'students'
+    __table_args__ = (
+        # The student list seeks on (last_name, id) among active students
+        db.Index('ix_students_active_last_name', 'active', 'last_name', 'id'),
+    )
+    _DICT_FIELDS = ('id', 'grade_level', 'monthly_services', 'active', 'anonymous_id',
+                    'created_at', 'updated_at')
+    _ISO_FIELDS = frozenset({'created_at', 'updated_at'})
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -51,7 +65,53 @@ class Student(db.Model, AuditMixin, PrivacyMixin):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if not self.anonymous_id:
-            self.anonymous_id = uuid.uuid4().hex
+            self.anonymous_id = token_hex(16)
+    
+    @classmethod
+    def query_with_goal_counts(cls):
+        """Query for list views that fetches active_goals_count with each row."""
+        return cls.query.options(undefer(cls.active_goals_count))
+    
+    @classmethod
+    def list_select(cls):
+        """Core SELECT of what list views serialize, goals_count included.
+
+        Add filters, ordering and paging, execute it, and pass the rows to
+        ``dicts_from_rows``. No ORM instances are built.
+        """
+        return select(
+            cls.id, cls.grade_level, cls.monthly_services, cls.active, cls.anonymous_id,
+            cls.created_at, cls.updated_at, cls.active_goals_count, cls.anonymized,
+            cls.first_name, cls.last_name, cls.preferred_name, cls.pronouns,
+            cls.display_name.label('display_name')
+        )
+    
+    @staticmethod
+    def dicts_from_rows(rows):
+        """Build ``to_dict()`` dicts from ``list_select`` rows."""
+        students = []
+        append = students.append
+        for (id_, grade_level, monthly_services, active, anonymous_id, created_at, updated_at,
+             goals_count, anonymized, first_name, last_name, preferred_name, pronouns,
+             display_name) in rows:
+            data = {
+                'id': id_,
+                'grade_level': grade_level,
+                'monthly_services': monthly_services,
+                'active': active,
+                'anonymous_id': anonymous_id,
+                'created_at': None if created_at is None else created_at.isoformat(),
+                'updated_at': None if updated_at is None else updated_at.isoformat(),
+                'goals_count': goals_count or 0,
+            }
+            if not anonymized:
+                data['first_name'] = first_name
+                data['last_name'] = last_name
+                data['preferred_name'] = preferred_name
+                data['pronouns'] = pronouns
+            data['display_name'] = display_name
+            append(data)
+        return students
     
     @hybrid_property
     def display_name(self):
@@ -60,6 +120,14 @@ class Student(db.Model, AuditMixin, PrivacyMixin):
             return f"Student {self.anonymous_id[:8]}"
         return f"{self.first_name} {self.last_name}"
     
+    @display_name.expression
+    def display_name(cls):
+        """SQL form of display_name, so lists can filter and sort on it."""
+        return case(
+            (cls.anonymized.is_(True), 'Student ' + func.substr(cls.anonymous_id, 1, 8)),
+            else_=cls.first_name + ' ' + cls.last_name,
+        )
+    
     def anonymize(self):
         """Anonymize student data while preserving educational value."""
         super().anonymize()
@@ -69,16 +137,8 @@ class Student(db.Model, AuditMixin, PrivacyMixin):
     
     def to_dict(self, include_sensitive=True):
         """Convert to dictionary with privacy controls."""
-        data = {
-            'id': self.id,
-            'grade_level': self.grade_level,
-            'monthly_services': self.monthly_services,
-            'active': self.active,
-            'anonymous_id': self.anonymous_id,
-            'goals_count': len([g for g in self.goals if g.active]),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        data = self._columns_dict()
+        data['goals_count'] = self.active_goals_count or 0
         
         if include_sensitive and not self.anonymized:
             data.update({
@@ -95,10 +155,17 @@ class Student(db.Model, AuditMixin, PrivacyMixin):
 
 # Add these to models/student.py after the Student model
 
-class Goal(db.Model):
+class Goal(db.Model, SerializeMixin):
     """Goal model for student objectives."""
     
     __tablename__ = 'goals'
+    __table_args__ = (
+        # Student.active_goals_count counts one student's active goals
+        db.Index('ix_goals_student_active', 'student_id', 'active'),
+    )
+    _DICT_FIELDS = ('id', 'student_id', 'description', 'target_date', 'completion_criteria',
+                    'active', 'last_reviewed', 'created_at')
+    _ISO_FIELDS = frozenset({'target_date', 'last_reviewed', 'created_at'})
     
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
@@ -114,15 +181,45 @@ class Goal(db.Model):
     last_reviewed = db.Column(db.Date)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, onupdate=utcnow())
     
     # Relationships
     student = db.relationship('Student', back_populates='goals')
     objectives = db.relationship('Objective', back_populates='goal', cascade='all, delete-orphan')
     
-    def calculate_progress(self):
+    @classmethod
+    def query_with_objectives(cls):
+        """Query that eager-loads objectives and their trial logs for to_dict."""
+        return cls.query.options(
+            selectinload(cls.objectives).selectinload(Objective.trial_logs)
+        )
+    
+    @classmethod
+    def bulk_progress(cls, goal_ids):
+        """Return {goal_id: (progress_percentage, objectives_count)} in one GROUP BY.
+
+        List views pass the result to ``to_dict(progress_map=...)`` so goals
+        are serialized without loading their objectives.
+        """
+        if not goal_ids:
+            return {}
+        active_progress = case(
+            (Objective.active.is_(True),
+             func.coalesce(Objective.recent_progress, Objective.current_progress, 0.0))
+        )
+        rows = db.session.execute(
+            select(Objective.goal_id, func.avg(active_progress), func.count(Objective.id))
+            .where(Objective.goal_id.in_(goal_ids))
+            .group_by(Objective.goal_id)
+        )
+        return {goal_id: (round(progress or 0.0, 1), count) for goal_id, progress, count in rows}
+    
+    def calculate_progress(self, progress_map=None):
         """Calculate overall goal progress from objectives."""
+        if progress_map is not None:
+            return progress_map.get(self.id, (0.0, 0))[0]
+        
         if not self.objectives:
             return 0.0
         
@@ -130,28 +227,41 @@ class Goal(db.Model):
         if not active_objectives:
             return 0.0
         
-        total_progress = sum(obj.current_progress or 0 for obj in active_objectives)
+        total_progress = sum(obj.progress for obj in active_objectives)
         return round(total_progress / len(active_objectives), 1)
     
-    def to_dict(self):
-        """Convert to dictionary."""
-        return {
-            'id': self.id,
-            'student_id': self.student_id,
-            'description': self.description,
-            'target_date': self.target_date.isoformat() if self.target_date else None,
-            'completion_criteria': self.completion_criteria,
-            'active': self.active,
-            'progress_percentage': self.calculate_progress(),
-            'last_reviewed': self.last_reviewed.isoformat() if self.last_reviewed else None,
-            'objectives_count': len(self.objectives),
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+    def to_dict(self, progress_map=None):
+        """Convert to dictionary.
+
+        ``progress_map`` is the result of ``Goal.bulk_progress`` for a batch of
+        goals; without it progress and counts come from ``self.objectives``.
+        """
+        data = self._columns_dict()
+        if progress_map is not None:
+            progress, objectives_count = progress_map.get(self.id, (0.0, 0))
+            data['progress_percentage'] = progress
+            data['objectives_count'] = objectives_count
+        else:
+            data['progress_percentage'] = self.calculate_progress()
+            data['objectives_count'] = len(self.objectives)
+        return data
+
+# Declared here rather than on Student because the subquery needs Goal
+Student.active_goals_count = db.column_property(
+    select(func.count(Goal.id))
+    .where(Goal.student_id == Student.id, Goal.active.is_(True))
+    .correlate_except(Goal)
+    .scalar_subquery(),
+    deferred=True,
+)
 
-class Objective(db.Model):
+class Objective(db.Model, SerializeMixin):
     """Objective model for specific measurable targets."""
     
     __tablename__ = 'objectives'
+    _DICT_FIELDS = ('id', 'goal_id', 'description', 'accuracy_target', 'notes', 'active',
+                    'baseline', 'created_at')
+    _ISO_FIELDS = frozenset({'created_at'})
     
     id = db.Column(db.Integer, primary_key=True)
     goal_id = db.Column(db.Integer, db.ForeignKey('goals.id'), nullable=False)
@@ -165,41 +275,28 @@ class Objective(db.Model):
     # Progress tracking
     current_progress = db.Column(db.Float, default=0.0)
     baseline = db.Column(db.Float)
+    # Average independence over the recent trial logs, kept by TrialLog's
+    # write events; NULL when there are none, so current_progress shows
+    recent_progress = db.Column(db.Float)
     
     # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = db.Column(db.DateTime, onupdate=utcnow())
     
     # Relationships
     goal = db.relationship('Goal', back_populates='objectives')
     trial_logs = db.relationship('TrialLog', back_populates='objective')
     
-    def calculate_recent_progress(self, days=30):
-        """Calculate progress from recent trial logs."""
-        from datetime import timedelta
-        cutoff_date = date.today() - timedelta(days=days)
-        
-        recent_logs = [log for log in self.trial_logs 
-                      if log.session_date >= cutoff_date]
-        
-        if not recent_logs:
-            return self.current_progress or 0.0
-        
-        # Average independence percentage from recent logs
-        avg_independence = sum(log.independence_percentage for log in recent_logs) / len(recent_logs)
-        return round(avg_independence, 1)
+    @property
+    def progress(self):
+        """Recent trial log progress, falling back to the entered current_progress."""
+        if self.recent_progress is not None:
+            return self.recent_progress
+        return self.current_progress or 0.0
     
     def to_dict(self):
         """Convert to dictionary."""
-        return {
-            'id': self.id,
-            'goal_id': self.goal_id,
-            'description': self.description,
-            'accuracy_target': self.accuracy_target,
-            'notes': self.notes,
-            'active': self.active,
-            'current_progress': self.calculate_recent_progress(),
-            'baseline': self.baseline,
-            'trial_logs_count': len(self.trial_logs),
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        data = self._columns_dict()
+        data['current_progress'] = self.progress
+        data['trial_logs_count'] = len(self.trial_logs)
+        return data
@@ -1,5 +1,6 @@
 from flask import Blueprint
 import datetime
+import importlib
 
 
 # Central blueprint definitions used across route modules
@@ -7,23 +8,26 @@ bp_api = Blueprint('api', __name__)
 bp_auth = Blueprint('auth', __name__)
 
 
-def register_blueprints(app):
-    """Register all blueprints with the application."""
+# (module, blueprint attribute, url_prefix) for every core blueprint. Modules
+# are only imported when registered, so callers that need a subset (CLI
+# tools, workers, focused tests) can pass their own specs. A url_prefix of
+# None keeps the prefix declared on the blueprint itself.
+BLUEPRINT_SPECS = (
+    ('routes.api', 'bp_api', '/api'),
+    ('routes.auth', 'bp_auth', '/auth'),
+    ('routes.students', 'students_bp', None),
+    ('routes.sessions', 'sessions_bp', None),
+    ('routes.soap', 'soap_bp', None),
+    ('routes.calendar', 'calendar_bp', None),
+)
 
-    # Import modules so their routes are attached to the shared blueprints
-    from . import api as _api, auth as _auth  # noqa: F401
-    from .students import students_bp
-    from .sessions import sessions_bp
-    from .soap import soap_bp
-    from .calendar import calendar_bp
 
-    # Register shared blueprints
-    app.register_blueprint(bp_api, url_prefix='/api')
-    app.register_blueprint(bp_auth, url_prefix='/auth')
-    app.register_blueprint(students_bp)
-    app.register_blueprint(sessions_bp)
-    app.register_blueprint(soap_bp)
-    app.register_blueprint(calendar_bp)
+def register_blueprints(app, specs=BLUEPRINT_SPECS):
+    """Register blueprints with the application."""
+
+    for module_name, attr, url_prefix in specs:
+        blueprint = getattr(importlib.import_module(module_name), attr)
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
 
     # Handle missing reports blueprint gracefully
     try:
@@ -1,12 +1,17 @@
-from flask import request, jsonify, current_app
+from flask import request, jsonify, current_app, g
 from marshmallow import Schema, fields, ValidationError, validate
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import case, exists, func, select, update
 from extensions import db
 from auth.models import User
 import re
 
 from . import bp_auth
 
+# Failed-login lockout policy
+MAX_FAILED_LOGINS = 5
+LOCK_DURATION = timedelta(minutes=30)
+
 # Validation schemas
 class LoginSchema(Schema):
     username = fields.Str(required=True, validate=validate.Length(min=3, max=80))
@@ -23,23 +28,50 @@ class RegisterSchema(Schema):
 class RefreshSchema(Schema):
     refresh_token = fields.Str(required=True, validate=validate.Length(min=16))
 
+# Schemas are stateless for .load(), so build them once per process
+_login_schema = LoginSchema()
+_register_schema = RegisterSchema()
+_refresh_schema = RefreshSchema()
+
 
-def _get_bearer_token() -> str | None:
-    """Extract a Bearer token from the Authorization header, or None."""
-    auth_header = request.headers.get('Authorization')
-    if not auth_header or not auth_header.startswith('Bearer '):
-        return None
-    return auth_header.split(' ', 1)[1].strip()
+def _json_body():
+    """Parse the raw request body with the app's JSON provider.
+
+    Reads the bytes once (no intermediate ``str``) and hands them to
+    ``current_app.json`` - orjson when installed. Malformed JSON surfaces
+    as a ValidationError so views answer with their usual 400.
+    """
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    try:
+        return current_app.json.loads(raw)
+    except ValueError:
+        raise ValidationError({'_schema': ['Invalid JSON body']})
+
+# One pass covers the common (valid) case; the per-rule scan below only
+# runs to pick the error message when this fails.
+_STRONG_PASSWORD_RE = re.compile(r'(?=.*[A-Z])(?=.*[a-z])(?=.*\d).{8,}', re.DOTALL)
 
 def validate_password_strength(password):
     """Validate password meets security requirements."""
+    if _STRONG_PASSWORD_RE.match(password):
+        return True, "Password is valid"
     if len(password) < 8:
         return False, "Password must be at least 8 characters long"
-    if not re.search(r'[A-Z]', password):
+    has_upper = has_lower = has_digit = False
+    for ch in password:
+        if 'A' <= ch <= 'Z':
+            has_upper = True
+        elif 'a' <= ch <= 'z':
+            has_lower = True
+        elif ch.isdecimal():
+            has_digit = True
+    if not has_upper:
         return False, "Password must contain at least one uppercase letter"
-    if not re.search(r'[a-z]', password):
+    if not has_lower:
         return False, "Password must contain at least one lowercase letter"
-    if not re.search(r'\d', password):
+    if not has_digit:
         return False, "Password must contain at least one number"
     return True, "Password is valid"
 
@@ -53,8 +85,7 @@ def auth_health_check():
 def login():
     """User login endpoint."""
     try:
-        schema = LoginSchema()
-        data = schema.load(request.json)
+        data = _login_schema.load(_json_body())
         username = data['username']
         password = data['password']
         user = User.query.filter_by(username=username).first()
@@ -65,16 +96,33 @@ def login():
         if not user.active:
             return jsonify({'error': 'Account is deactivated'}), 403
         if not user.check_password(password):
-            user.failed_login_attempts += 1
-            if user.failed_login_attempts >= 5:
-                user.lock_account()
-                db.session.commit()
-                return jsonify({'error': 'Account locked due to too many failed attempts'}), 423
+            # Bump the counter and apply the lock in one atomic UPDATE so
+            # concurrent attempts can't race a read-modify-write
+            attempts = func.coalesce(User.failed_login_attempts, 0) + 1
+            stmt = (
+                update(User)
+                .where(User.id == user.id)
+                .values(
+                    failed_login_attempts=attempts,
+                    locked_until=case(
+                        (attempts >= MAX_FAILED_LOGINS, datetime.utcnow() + LOCK_DURATION),
+                        else_=User.locked_until,
+                    ),
+                )
+                .returning(User.failed_login_attempts)
+                .execution_options(synchronize_session=False)
+            )
+            failed_attempts = db.session.execute(stmt).scalar_one()
             db.session.commit()
-            return jsonify({'error': 'Invalid credentials', 'attempts_remaining': 5 - user.failed_login_attempts}), 401
+            if failed_attempts >= MAX_FAILED_LOGINS:
+                return jsonify({'error': 'Account locked due to too many failed attempts'}), 423
+            return jsonify({'error': 'Invalid credentials', 'attempts_remaining': MAX_FAILED_LOGINS - failed_attempts}), 401
+        # unlock_account() only emits an UPDATE when there was something to
+        # reset; last_login is buffered and written in batches by the app's
+        # teardown hook
         user.unlock_account()
-        user.last_login = datetime.utcnow()
         db.session.commit()
+        user.record_login()
         access_token = user.generate_access_token()
         refresh_token = user.generate_refresh_token()
         current_app.logger.info(f'User {username} logged in successfully')
@@ -94,8 +142,7 @@ def login():
 def register():
     """User registration endpoint."""
     try:
-        schema = RegisterSchema()
-        data = schema.load(request.json)
+        data = _register_schema.load(_json_body())
         # Normalize inputs
         username_norm = data['username'].strip()
         email_norm = data['email'].strip().lower()
@@ -104,9 +151,10 @@ def register():
         if not is_valid:
             return jsonify({'error': message}), 400
 
-        if User.query.filter_by(username=username_norm).first():
+        # SELECT EXISTS(...) answers from the unique indexes without loading a row
+        if db.session.scalar(select(exists().where(User.username == username_norm))):
             return jsonify({'error': 'Username already exists'}), 409
-        if User.query.filter_by(email=email_norm).first():
+        if db.session.scalar(select(exists().where(User.email == email_norm))):
             return jsonify({'error': 'Email already registered'}), 409
 
         user = User(
@@ -131,10 +179,10 @@ def register():
 def get_profile():
     """Get current user profile."""
     try:
-        token = _get_bearer_token()
-        if not token:
+        # g.current_user is resolved once per request by load_current_user()
+        if 'current_user' not in g:
             return jsonify({'error': 'Authentication required'}), 401
-        user = User.verify_token(token)
+        user = g.current_user
         if not user:
             return jsonify({'error': 'Invalid or expired token'}), 401
         return jsonify({'user': user.to_dict(include_sensitive=True)})
@@ -146,11 +194,9 @@ def get_profile():
 def logout():
     """User logout endpoint."""
     try:
-        token = _get_bearer_token()
-        if token:
-            user = User.verify_token(token)
-            if user:
-                current_app.logger.info(f'User {user.username} logged out')
+        user = g.get('current_user')
+        if user:
+            current_app.logger.info(f'User {user.username} logged out')
         return jsonify({'message': 'Logout successful'})
     except Exception as e:
         current_app.logger.error(f'Logout error: {str(e)}')
@@ -160,8 +206,7 @@ def logout():
 def refresh_token():
     """Refresh access token using refresh token."""
     try:
-        schema = RefreshSchema()
-        data = schema.load(request.json or {})
+        data = _refresh_schema.load(_json_body())
         rt = data['refresh_token']
 
         user = User.verify_refresh_token(rt)
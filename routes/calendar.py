@@ -2,6 +2,7 @@
 from flask import Blueprint, request, jsonify, current_app
 from marshmallow import Schema, fields, ValidationError, validate
 from datetime import datetime, date, time, timedelta
+from sqlalchemy import insert
 from extensions import db
 from models import Session, Student
 from auth.decorators import require_auth, require_permission
@@ -35,6 +36,9 @@ class EventUpdateSchema(Schema):
     notes = fields.Str(validate=validate.Length(max=1000), allow_none=True)
     plan_notes = fields.Str(validate=validate.Length(max=1000), allow_none=True)
 
+_event_create_schema = EventCreateSchema()
+_event_update_schema = EventUpdateSchema()
+
 @calendar_bp.route('/api/calendar/events', methods=['GET'])
 @require_auth
 def get_calendar_events():
@@ -57,22 +61,22 @@ def get_calendar_events():
             start_date = today.replace(day=1)
             end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
         
-        # Build query
-        query = Session.query.filter(
+        # Build query; plain rows with the student's name joined in, no ORM objects
+        query = Session.calendar_select().where(
             Session.session_date >= start_date,
             Session.session_date <= end_date
         )
         
         if student_id:
-            query = query.filter(Session.student_id == student_id)
+            query = query.where(Session.student_id == student_id)
             
         if event_type:
-            query = query.filter(Session.event_type == event_type)
+            query = query.where(Session.event_type == event_type)
         
-        sessions = query.order_by(Session.session_date, Session.start_time).all()
+        rows = db.session.execute(query.order_by(Session.session_date, Session.start_time))
         
         # Convert to FullCalendar format
-        events = [session.to_calendar_event() for session in sessions]
+        events = Session.calendar_events_from_rows(rows)
         
         current_app.logger.info(f'Retrieved {len(events)} calendar events')
         
@@ -89,11 +93,12 @@ def create_calendar_event():
     """Create a new calendar event/session."""
     
     try:
-        schema = EventCreateSchema()
-        event_data = schema.load(request.json)
+        event_data = _event_create_schema.load(request.json)
         
-        # Validate student exists
-        student = Student.query.get_or_404(event_data['student_id'])
+        # Validate student exists (get_or_404's abort would be swallowed below)
+        student = db.session.get(Student, event_data['student_id'])
+        if student is None:
+            return jsonify({'error': 'Student not found'}), 404
         
         # Validate time logic
         if event_data['start_time'] >= event_data['end_time']:
@@ -117,13 +122,17 @@ def create_calendar_event():
         # Create session
         session = Session(**event_data)
         db.session.add(session)
+        db.session.flush()
+        # Serialize while the session and student are loaded; commit expires
+        # them and reading them afterwards would cost two more SELECTs
+        event = session.to_calendar_event()
         db.session.commit()
         
-        current_app.logger.info(f'Created calendar event for {student.display_name}')
+        current_app.logger.info(f'Created calendar event for {event["title"]}')
         
         return jsonify({
             'message': 'Event created successfully',
-            'event': session.to_calendar_event()
+            'event': event
         }), 201
         
     except ValidationError as e:
@@ -142,8 +151,7 @@ def update_calendar_event(event_id):
     try:
         session = Session.query.get_or_404(event_id)
         
-        schema = EventUpdateSchema()
-        update_data = schema.load(request.json)
+        update_data = _event_update_schema.load(request.json)
         
         # Validate time logic if both times provided
         if ('start_time' in update_data and 'end_time' in update_data and 
@@ -217,8 +225,7 @@ def create_makeup_session(event_id):
         # Get makeup session details
         makeup_data = request.json
         
-        schema = EventCreateSchema()
-        makeup_details = schema.load({
+        makeup_details = _event_create_schema.load({
             'student_id': original_session.student_id,
             'session_date': makeup_data['session_date'],
             'start_time': makeup_data['start_time'],
@@ -265,22 +272,26 @@ def create_bulk_sessions():
         session_date = datetime.strptime(bulk_data['session_date'], '%Y-%m-%d').date()
         default_duration = bulk_data.get('duration_minutes', 30)
         
-        students = Student.query.filter(Student.active.is_(True)).all()
-        created_sessions = []
+        student_ids = db.session.scalars(
+            db.select(Student.id).where(Student.active.is_(True))
+        ).all()
         
-        for student in students:
-            # Skip if student already has session on this date
-            existing = Session.query.filter(
-                Session.student_id == student.id,
+        # One query for everyone already booked on this date
+        booked = {
+            row.student_id
+            for row in db.session.query(Session.student_id).filter(
                 Session.session_date == session_date
-            ).first()
-            
-            if existing:
+            )
+        }
+        
+        rows = []
+        for student_id in student_ids:
+            # Skip if student already has session on this date
+            if student_id in booked:
                 continue
             
             # Calculate time slot (simple scheduling)
-            session_count = len(created_sessions)
-            start_minutes = 9 * 60 + (session_count * default_duration)
+            start_minutes = 9 * 60 + (len(rows) * default_duration)
             
             start_hour = start_minutes // 60
             start_minute = start_minutes % 60
@@ -291,26 +302,30 @@ def create_bulk_sessions():
             if start_hour >= 17:  # Don't schedule past 5 PM
                 break
             
-            session = Session(
-                student_id=student.id,
-                session_date=session_date,
-                start_time=time(start_hour, start_minute),
-                end_time=time(end_hour, end_minute),
-                event_type='Session',
-                session_type='Individual',
-                status='Scheduled'
-            )
-            
-            db.session.add(session)
-            created_sessions.append(session)
-        
-        db.session.commit()
-        
-        current_app.logger.info(f'Created {len(created_sessions)} bulk sessions')
+            rows.append({
+                'student_id': student_id,
+                'session_date': session_date,
+                'start_time': time(start_hour, start_minute),
+                'end_time': time(end_hour, end_minute),
+                'event_type': 'Session',
+                'session_type': 'Individual',
+                'status': 'Scheduled'
+            })
+        
+        events = []
+        if rows:
+            # One batched INSERT for all sessions, then one SELECT for the events
+            ids = db.session.scalars(insert(Session).returning(Session.id), rows).all()
+            db.session.commit()
+            events = Session.calendar_events_from_rows(db.session.execute(
+                Session.calendar_select().where(Session.id.in_(ids)).order_by(Session.start_time)
+            ))
+        
+        current_app.logger.info(f'Created {len(events)} bulk sessions')
         
         return jsonify({
-            'message': f'Created {len(created_sessions)} sessions',
-            'sessions': [session.to_calendar_event() for session in created_sessions]
+            'message': f'Created {len(events)} sessions',
+            'sessions': events
         }), 201
         
     except Exception as e:
@@ -1,4 +1,5 @@
-from flask import Blueprint, request, jsonify, make_response
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from sqlalchemy.orm import defer, joinedload, selectinload
 from auth.decorators import token_required, role_required
 from extensions import db
 from models import Student, Goal, Objective, Session, TrialLog, SOAPNote
@@ -17,6 +18,43 @@ except ImportError:
 logger = logging.getLogger(__name__)
 reports_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 
+# Rows fetched per round-trip (and written per chunk) when streaming exports
+EXPORT_BATCH_SIZE = 1000
+
+
+# Opening of an export body; each field holds an already-serialized value
+# and the rows follow inside "data"
+_EXPORT_JSON_PREFIX = (
+    '{{"report_type":{report_type},"period":{period},"exported_at":{exported_at},"data":['
+)
+
+
+def _stream_json_export(envelope, query):
+    """Yield ``envelope`` as JSON with ``query``'s rows streamed into ``data``.
+
+    Rows are fetched ``EXPORT_BATCH_SIZE`` at a time and serialized as they
+    arrive, so memory stays flat regardless of the export size.
+    """
+    dumps = current_app.json.dumps
+    yield _EXPORT_JSON_PREFIX.format(**{key: dumps(value) for key, value in envelope.items()})
+    try:
+        batch = []
+        first = True
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            batch.append(dumps(row.to_dict()))
+            if len(batch) == EXPORT_BATCH_SIZE:
+                yield ('' if first else ',') + ','.join(batch)
+                first = False
+                batch = []
+        if batch:
+            yield ('' if first else ',') + ','.join(batch)
+    except Exception:
+        # The 200 is already sent and the view's handler has returned; log it
+        # and let the server abort the response rather than close it cleanly
+        current_app.logger.exception(f"Export of {envelope['report_type']} failed mid-stream")
+        raise
+    yield ']}\n'
+
 @reports_bp.route('/student/<int:student_id>/progress', methods=['GET'])
 @token_required
 def get_student_progress_report(student_id):
@@ -40,8 +78,11 @@ def get_student_progress_report(student_id):
         start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        # Get student's goals and objectives
-        goals = Goal.query.filter(
+        # Get student's goals and objectives, minus the long text the report never shows
+        goals = Goal.query.options(
+            defer(Goal.completion_criteria),
+            selectinload(Goal.objectives).defer(Objective.notes)
+        ).filter(
             Goal.student_id == student_id,
             Goal.active.is_(True)
         ).all()
@@ -58,12 +99,14 @@ def get_student_progress_report(student_id):
             Session.session_date.between(start_date_obj, end_date_obj)
         ).order_by(Session.session_date).all()
         
-        # Get SOAP notes in date range
-        soap_notes = SOAPNote.query.filter(
-            SOAPNote.student_id == student_id,
-            SOAPNote.session_date.between(start_date_obj, end_date_obj),
-            SOAPNote.anonymized.is_(False)
-        ).order_by(SOAPNote.session_date).all()
+        # Only the number of SOAP notes is reported; don't pull their text
+        soap_note_count = db.session.scalar(
+            db.select(db.func.count(SOAPNote.id)).where(
+                SOAPNote.student_id == student_id,
+                SOAPNote.session_date.between(start_date_obj, end_date_obj),
+                SOAPNote.anonymized.is_(False)
+            )
+        )
         
         # Calculate progress metrics
         progress_data = {}
@@ -143,7 +186,7 @@ def get_student_progress_report(student_id):
             'goals_progress': list(progress_data.values()),
             'session_statistics': session_stats,
             'total_trial_logs': len(trial_logs),
-            'total_soap_notes': len(soap_notes),
+            'total_soap_notes': soap_note_count,
             'generated_at': datetime.utcnow().isoformat()
         }
         
@@ -269,7 +312,11 @@ def get_goal_progress_summary():
         # Optional student filter
         student_id = request.args.get('student_id', type=int)
         
-        query = Goal.query.filter(Goal.active.is_(True))
+        query = Goal.query.options(
+            defer(Goal.completion_criteria),
+            joinedload(Goal.student),
+            selectinload(Goal.objectives).defer(Objective.notes)
+        ).filter(Goal.active.is_(True))
         if student_id:
             query = query.filter(Goal.student_id == student_id)
         
@@ -357,7 +404,7 @@ def get_attendance_report():
         student_id = request.args.get('student_id', type=int)
         
         # Get sessions data
-        query = Session.query.filter(
+        query = Session.query_with_student().filter(
             Session.session_date.between(start_date_obj, end_date_obj)
         )
         
@@ -598,33 +645,30 @@ def export_report(report_type):
         start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
         end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
         
-        # Generate data based on report type
+        # Build the query for the report type; rows are streamed, not loaded up front
         if report_type == 'students':
-            data = [
-                student.to_dict()
-                for student in Student.query.filter(Student.active.is_(True)).all()
-            ]
+            query = Student.query_with_goal_counts().filter(Student.active.is_(True))
         elif report_type == 'sessions':
-            sessions = Session.query.filter(
+            query = Session.query.filter(
                 Session.session_date.between(start_date_obj, end_date_obj)
-            ).all()
-            data = [session.to_dict() for session in sessions]
+            )
         elif report_type == 'trial_logs':
-            logs = TrialLog.query.filter(
+            query = TrialLog.query.filter(
                 TrialLog.session_date.between(start_date_obj, end_date_obj)
-            ).all()
-            data = [log.to_dict() for log in logs]
+            )
         elif report_type == 'goals':
-            goals = Goal.query.filter(Goal.active.is_(True)).all()
-            data = [goal.to_dict() for goal in goals]
+            query = Goal.query_with_objectives().filter(Goal.active.is_(True))
         
         if format_type == 'json':
-            response = make_response(jsonify({
+            envelope = {
                 'report_type': report_type,
                 'period': {'start_date': start_date, 'end_date': end_date},
-                'data': data,
                 'exported_at': datetime.utcnow().isoformat()
-            }))
+            }
+            response = Response(
+                stream_with_context(_stream_json_export(envelope, query)),
+                mimetype='application/json'
+            )
             response.headers['Content-Disposition'] = f'attachment; filename={report_type}_report.json'
             return response
         
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError, validate
+from sqlalchemy.orm import raiseload
 from extensions import db
 from models import Session
 from auth.decorators import require_auth
@@ -21,6 +22,8 @@ class SessionSchema(Schema):
     location = fields.Str(validate=validate.Length(max=100))
     notes = fields.Str(validate=validate.Length(max=1000))
 
+_session_schema = SessionSchema()
+
 @sessions_bp.route('/', methods=['GET'])
 @require_auth
 def get_sessions():
@@ -29,7 +32,8 @@ def get_sessions():
     start_date = request.args.get('start_date', type=lambda x: datetime.strptime(x, '%Y-%m-%d').date())
     end_date = request.args.get('end_date', type=lambda x: datetime.strptime(x, '%Y-%m-%d').date())
     
-    query = Session.query
+    # to_dict only reads columns; fail loudly if it ever starts lazy loading
+    query = Session.query.options(raiseload('*', sql_only=True))
     
     if student_id:
         query = query.filter_by(student_id=student_id)
@@ -45,9 +49,8 @@ def get_sessions():
 @require_auth
 def create_session():
     """Create a new session."""
-    schema = SessionSchema()
     try:
-        data = schema.load(request.json)
+        data = _session_schema.load(request.json)
         session = Session(**data)
         db.session.add(session)
         db.session.commit()
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError, validate
+from sqlalchemy.orm import raiseload
 from extensions import db
 from models import SOAPNote
 from auth.decorators import require_auth
@@ -15,13 +16,16 @@ class SOAPNoteSchema(Schema):
     plan = fields.Str(validate=validate.Length(max=2000))
     clinician_signature = fields.Str(validate=validate.Length(max=100))
 
+_soap_note_schema = SOAPNoteSchema()
+
 @soap_bp.route('/', methods=['GET'])
 @require_auth
 def get_soap_notes():
     """Get SOAP notes with optional filtering."""
     student_id = request.args.get('student_id', type=int)
     
-    query = SOAPNote.query
+    # to_dict only reads columns; fail loudly if it ever starts lazy loading
+    query = SOAPNote.query.options(raiseload('*', sql_only=True))
     if student_id:
         query = query.filter_by(student_id=student_id)
     
@@ -32,9 +36,8 @@ def get_soap_notes():
 @require_auth
 def create_soap_note():
     """Create a new SOAP note."""
-    schema = SOAPNoteSchema()
     try:
-        data = schema.load(request.json)
+        data = _soap_note_schema.load(request.json)
         note = SOAPNote(**data)
         db.session.add(note)
         db.session.commit()
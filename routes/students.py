@@ -1,7 +1,14 @@
+import base64
+import json
+from datetime import date, datetime, timedelta
+from math import ceil
+from secrets import token_hex
 from flask import Blueprint, request, jsonify
 from marshmallow import Schema, fields, ValidationError, validate, pre_load, INCLUDE
+from sqlalchemy import exists, func, insert, tuple_, update
+from sqlalchemy.orm import raiseload
 from extensions import db
-from models import Student
+from models import Student, TrialLog
 from auth.decorators import require_auth, require_permission
 
 students_bp = Blueprint('students', __name__, url_prefix='/api/students')
@@ -28,32 +35,97 @@ class StudentCreateSchema(Schema):
                 data["date_of_birth"] = data["dob"]
         return data
 
+class StudentUpdateSchema(StudentCreateSchema):
+    active = fields.Bool()
+
+_student_schema = StudentCreateSchema()
+_student_list_schema = StudentCreateSchema(many=True)
+_student_list_update_schema = StudentUpdateSchema(many=True, partial=True)
+
+# Schema fields backed by a Student column; the schema also lets unknown
+# fields through (INCLUDE), which bulk statements must drop
+_STUDENT_FIELDS = tuple(key for key in _student_schema.fields if key in Student.__table__.columns)
+_STUDENT_UPDATE_FIELDS = tuple(
+    key for key in _student_list_update_schema.fields if key in Student.__table__.columns
+)
+
+# Trial logs are listed from this far back unless start_date says otherwise
+TRIAL_LOG_DEFAULT_DAYS = 180
+TRIAL_LOG_MAX_PER_PAGE = 200
+
+def _encode_cursor(key, row_id):
+    """Opaque cursor for the list position just after (key, id)."""
+    return base64.urlsafe_b64encode(json.dumps([key, row_id]).encode()).decode()
+
+def _decode_cursor(cursor):
+    """Return the (key, id) a cursor points after, or None if it is malformed."""
+    try:
+        key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(key, str) or not isinstance(row_id, int):
+        return None
+    return key, row_id
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD query value; None passes through, bad input raises ValueError."""
+    if value is None:
+        return None
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
 @students_bp.route('/', methods=['GET'])
 @require_auth
 def get_students():
-    """Get all students with pagination."""
-    page = request.args.get('page', 1, type=int)
+    """List active students ordered by last name.
+
+    Pages are keyset-paginated: pass the previous page's ``next_cursor`` as
+    ``cursor``. ``total`` is only counted with ``include_total=true``. Older
+    clients can still pass ``page`` for offset pages with ``total``/``pages``.
+    """
     per_page = request.args.get('per_page', 20, type=int)
+    if per_page < 1:
+        per_page = 20
     
-    students = Student.query.filter_by(active=True).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
+    active = Student.active.is_(True)
+    # Plain rows straight into dicts; goals_count comes from a subquery
+    query = Student.list_select().where(active).order_by(Student.last_name, Student.id)
+    body = {}
     
-    return jsonify({
-        'students': [s.to_dict() for s in students.items],
-        'total': students.total,
-        'page': page,
-        'pages': students.pages
-    })
+    offset_pages = 'page' in request.args
+    if offset_pages:
+        page = max(request.args.get('page', 1, type=int), 1)
+        rows = db.session.execute(query.limit(per_page).offset((page - 1) * per_page)).all()
+        body['page'] = page
+    else:
+        cursor = request.args.get('cursor')
+        if cursor:
+            position = _decode_cursor(cursor)
+            if position is None:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            query = query.where(tuple_(Student.last_name, Student.id) > tuple_(*position))
+        # One extra row tells us whether there is a next page
+        rows = db.session.execute(query.limit(per_page + 1)).all()
+        next_cursor = None
+        if len(rows) > per_page:
+            rows = rows[:per_page]
+            next_cursor = _encode_cursor(rows[-1].last_name, rows[-1].id)
+        body['next_cursor'] = next_cursor
+    
+    body['students'] = Student.dicts_from_rows(rows)
+    if offset_pages or request.args.get('include_total', 'false').lower() == 'true':
+        total = db.session.scalar(db.select(func.count(Student.id)).where(active))
+        body['total'] = total
+        if offset_pages:
+            body['pages'] = ceil(total / per_page)
+    return jsonify(body)
 
 @students_bp.route('/', methods=['POST'])
 @require_auth
 @require_permission('write')
 def create_student():
     """Create a new student."""
-    schema = StudentCreateSchema()
     try:
-        data = schema.load(request.json)
+        data = _student_schema.load(request.json)
         # Map schema's date_of_birth field to model's dob
         if "date_of_birth" in data:
             data["dob"] = data.pop("date_of_birth")
@@ -64,13 +136,133 @@ def create_student():
     except ValidationError as e:
         return jsonify({'error': 'Validation failed', 'messages': e.messages}), 400
 
+@students_bp.route('/bulk', methods=['POST'])
+@require_auth
+@require_permission('write')
+def create_students_bulk():
+    """Create many students from a JSON array in one batched INSERT."""
+    if not isinstance(request.json, list):
+        return jsonify({'error': 'Expected a JSON array of students'}), 400
+    try:
+        records = _student_list_schema.load(request.json)
+    except ValidationError as e:
+        return jsonify({'error': 'Validation failed', 'messages': e.messages}), 400
+    
+    # Give every row the same keys so the INSERT goes out as one batch
+    rows = []
+    for data in records:
+        row = {key: data.get(key) for key in _STUDENT_FIELDS}
+        # Bulk INSERT bypasses Student.__init__, so assign the anonymous id here
+        row['anonymous_id'] = token_hex(16)
+        rows.append(row)
+    
+    ids = []
+    if rows:
+        # Core insert on the table: the ORM form drops None keys per row and
+        # would split the batch wherever optional fields differ
+        table = Student.__table__
+        ids = db.session.scalars(insert(table).returning(table.c.id), rows).all()
+        db.session.commit()
+    return jsonify({'created': len(ids), 'ids': ids}), 201
+
+@students_bp.route('/bulk', methods=['PUT'])
+@require_auth
+@require_permission('write')
+def update_students_bulk():
+    """Update many students from a JSON array of ``{id, ...fields}`` objects."""
+    payload = request.json
+    if not isinstance(payload, list) or not all(
+        isinstance(item, dict) and isinstance(item.get('id'), int) for item in payload
+    ):
+        return jsonify({'error': 'Expected a JSON array of objects with integer ids'}), 400
+    # Reject rather than drop keys that would not be written
+    unknown = {key for item in payload for key in item} - {'id', *_STUDENT_UPDATE_FIELDS}
+    if unknown:
+        return jsonify({'error': 'Fields cannot be bulk updated', 'fields': sorted(unknown)}), 400
+    try:
+        records = _student_list_update_schema.load(payload)
+    except ValidationError as e:
+        return jsonify({'error': 'Validation failed', 'messages': e.messages}), 400
+    
+    ids = {item['id'] for item in payload}
+    found = set(db.session.scalars(db.select(Student.id).where(Student.id.in_(ids))))
+    if found != ids:
+        return jsonify({'error': 'Students not found', 'ids': sorted(ids - found)}), 404
+    
+    # Rows with nothing but an id have nothing to write and are not counted
+    rows = []
+    for item, data in zip(payload, records):
+        values = {key: data[key] for key in _STUDENT_UPDATE_FIELDS if key in data}
+        if values:
+            rows.append({'id': item['id'], **values})
+    if rows:
+        # UPDATE ... WHERE id = ? as one executemany per distinct set of fields
+        db.session.execute(update(Student), rows)
+        db.session.commit()
+    return jsonify({'updated': len(rows)})
+
 @students_bp.route('/<int:student_id>', methods=['GET'])
 @require_auth
 def get_student(student_id):
     """Get a specific student."""
-    student = Student.query.get_or_404(student_id)
+    # goals_count rides along in the same SELECT instead of a follow-up query
+    student = Student.query_with_goal_counts().filter(Student.id == student_id).first_or_404()
     return jsonify(student.to_dict())
 
+@students_bp.route('/<int:student_id>/trial-logs', methods=['GET'])
+@require_auth
+def get_student_trial_logs(student_id):
+    """List a student's trial logs, newest first.
+
+    Keyset-paginated like the student list: pass ``next_cursor`` back as
+    ``cursor``. ``per_page`` defaults to 50 (max 200) and ``start_date``
+    to 180 days ago, so a student with years of logs is never sent whole.
+    """
+    per_page = request.args.get('per_page', 50, type=int)
+    if per_page < 1:
+        per_page = 50
+    per_page = min(per_page, TRIAL_LOG_MAX_PER_PAGE)
+    try:
+        start_date = _parse_date(request.args.get('start_date'))
+        end_date = _parse_date(request.args.get('end_date'))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
+    if start_date is None:
+        start_date = date.today() - timedelta(days=TRIAL_LOG_DEFAULT_DAYS)
+    
+    if not db.session.scalar(db.select(exists().where(Student.id == student_id))):
+        return jsonify({'error': 'Student not found'}), 404
+    
+    # to_dict only reads columns; fail loudly if it ever starts lazy loading
+    query = TrialLog.query.options(raiseload('*', sql_only=True)).filter(
+        TrialLog.student_id == student_id,
+        TrialLog.session_date >= start_date
+    )
+    if end_date:
+        query = query.filter(TrialLog.session_date <= end_date)
+    cursor = request.args.get('cursor')
+    if cursor:
+        position = _decode_cursor(cursor)
+        try:
+            position = position and (_parse_date(position[0]), position[1])
+        except ValueError:
+            position = None
+        if position is None:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(tuple_(TrialLog.session_date, TrialLog.id) < tuple_(*position))
+    
+    # One extra row tells us whether there is a next page
+    logs = query.order_by(TrialLog.session_date.desc(), TrialLog.id.desc()).limit(per_page + 1).all()
+    next_cursor = None
+    if len(logs) > per_page:
+        logs = logs[:per_page]
+        next_cursor = _encode_cursor(logs[-1].session_date.isoformat(), logs[-1].id)
+    return jsonify({
+        'trial_logs': [log.to_dict() for log in logs],
+        'start_date': start_date.isoformat(),
+        'next_cursor': next_cursor
+    })
+
 @students_bp.route('/<int:student_id>', methods=['PUT'])
 @require_auth
 @require_permission('write')
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Recompute every active objective's stored progress from its recent trial logs.
+
+Trial log writes keep Objective.recent_progress up to date, but logs age out
+of the rolling window without a write. Objectives left with no recent logs are
+reset to NULL, so they show their entered current_progress again. Schedule
+this nightly via cron.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import Objective, TrialLog
+
+def refresh_progress():
+    app = create_app()
+    
+    with app.app_context():
+        objective_ids = db.session.scalars(
+            db.select(Objective.id).where(Objective.active.is_(True))
+        ).all()
+        refreshed = TrialLog.refresh_objective_progress(objective_ids)
+        db.session.commit()
+        print(f"Refreshed progress for {refreshed} of {len(objective_ids)} objectives")
+
+if __name__ == "__main__":
+    refresh_progress()
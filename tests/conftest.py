@@ -2,6 +2,7 @@ import pathlib
 import sys
 
 import pytest
+from sqlalchemy import event
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
 
@@ -12,17 +13,9 @@ from auth.models import User
 
 @pytest.fixture
 def app():
+    # TestingConfig creates the tables on its in-memory StaticPool engine
     app = create_app('testing')
-    from sqlalchemy.pool import StaticPool
-    app.config.update(
-        SQLALCHEMY_DATABASE_URI='sqlite://',
-        SQLALCHEMY_ENGINE_OPTIONS={
-            'connect_args': {'check_same_thread': False},
-            'poolclass': StaticPool,
-        },
-    )
     with app.app_context():
-        db.create_all()
         yield app
         db.session.remove()
         db.drop_all()
@@ -34,7 +27,7 @@ def client(app):
 
 
 @pytest.fixture
-def auth_header(app):
+def auth_header(app, monkeypatch):
     with app.app_context():
         user = User(
             username='tester',
@@ -50,5 +43,18 @@ def auth_header(app):
             token = token.decode('utf-8')
         def _verify(_token):
             return user
-        User.verify_token = staticmethod(_verify)
+        monkeypatch.setattr(User, 'verify_token', staticmethod(_verify))
     return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def sql_statements(app):
+    """List of SQL statements executed on the app's engine during the test."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', _record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', _record)
@@ -1,3 +1,219 @@
 def test_profile_requires_token(client):
     response = client.get('/auth/profile', headers={'Authorization': 'Bearer invalid'})
     assert response.status_code == 401
+
+
+def test_validate_password_strength_messages():
+    from routes.auth import validate_password_strength
+
+    assert validate_password_strength('Password1') == (True, 'Password is valid')
+    assert validate_password_strength('Pass1')[1].startswith('Password must be at least 8')
+    assert 'uppercase' in validate_password_strength('password1')[1]
+    assert 'lowercase' in validate_password_strength('PASSWORD1')[1]
+    assert 'number' in validate_password_strength('Password')[1]
+
+
+def test_repeated_failed_logins_lock_account(app, client):
+    from extensions import db
+    from auth.models import User
+
+    user = User(username='locky', email='locky@example.com', first_name='L', last_name='Y')
+    user.set_password('Password123')
+    db.session.add(user)
+    db.session.commit()
+
+    bad = {'username': 'locky', 'password': 'WrongPass123'}
+    for remaining in (4, 3, 2, 1):
+        response = client.post('/auth/login', json=bad)
+        assert response.status_code == 401
+        assert response.get_json()['attempts_remaining'] == remaining
+
+    assert client.post('/auth/login', json=bad).status_code == 423
+    locked = client.post('/auth/login', json={'username': 'locky', 'password': 'Password123'})
+    assert locked.status_code == 423
+
+
+def test_profile_uses_current_user_from_token(client, auth_header):
+    assert client.get('/auth/profile').get_json() == {'error': 'Authentication required'}
+    response = client.get('/auth/profile', headers=auth_header)
+    assert response.status_code == 200
+    assert response.get_json()['user']['username'] == 'tester'
+
+
+def test_successful_login_records_last_login(app, client):
+    from extensions import db
+    from auth.models import User
+
+    user = User(username='logger', email='logger@example.com', first_name='L', last_name='G')
+    user.set_password('Password123')
+    db.session.add(user)
+    db.session.commit()
+
+    response = client.post('/auth/login', json={'username': 'logger', 'password': 'Password123'})
+    assert response.status_code == 200
+    assert response.get_json()['user']['last_login'] is not None
+    db.session.expire_all()
+    assert db.session.get(User, user.id).last_login is not None
+
+
+def test_buffered_last_login_is_flushed_by_any_later_request(app, client, monkeypatch):
+    import time
+
+    import auth.models
+    from extensions import db
+    from auth.models import User
+
+    user = User(username='buffered', email='buffered@example.com')
+    user.set_password('Password123')
+    db.session.add(user)
+    db.session.commit()
+
+    monkeypatch.setitem(app.config, 'LAST_LOGIN_FLUSH_INTERVAL', 30)
+    buffer = auth.models._login_buffer()
+    monkeypatch.setattr(buffer, 'last_flush', time.monotonic())
+    response = client.post('/auth/login', json={'username': 'buffered', 'password': 'Password123'})
+    assert response.status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user.id).last_login is None
+
+    # Once the interval has passed, a request that is not a login writes it
+    monkeypatch.setattr(buffer, 'last_flush', time.monotonic() - 31)
+    client.get('/api/health')
+    db.session.expire_all()
+    assert db.session.get(User, user.id).last_login is not None
+    assert not buffer.pending
+
+
+def test_login_buffers_are_kept_per_app(app):
+    from app import create_app
+    from extensions import db
+    from auth.models import User, flush_last_logins
+
+    user = User(username='buffered', email='buffered@example.com')
+    user.set_password('Password123')
+    db.session.add(user)
+    db.session.commit()
+    user.record_login()
+
+    # Another app in the same process has its own buffer and database
+    with create_app('testing').app_context():
+        assert flush_last_logins(force=True) == 0
+    assert flush_last_logins(force=True) == 1
+
+
+def test_login_rejects_malformed_json(client):
+    response = client.post('/auth/login', data='{not json', content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Validation failed'
+
+
+def test_check_password_hashes_once_per_request(app, monkeypatch):
+    import auth.models
+    from auth.models import User
+
+    user = User(username='hasher', email='hasher@example.com')
+    user.set_password('Password1')
+    calls = []
+    real_check = auth.models._verify_password
+
+    def counting_check(pwhash, password):
+        calls.append(password)
+        return real_check(pwhash, password)
+
+    monkeypatch.setattr(auth.models, '_verify_password', counting_check)
+    assert user.check_password('Password1')
+    assert user.check_password('Password1')
+    assert not user.check_password('wrong')
+    assert calls == ['Password1', 'wrong']
+
+    user.set_password('Changed1')
+    assert user.check_password('Changed1')
+    assert calls == ['Password1', 'wrong', 'Changed1']
+
+
+def test_tokens_are_signed_with_jwt_secret_key(app):
+    from datetime import datetime, timedelta
+
+    import jwt
+    from auth.models import User
+    from extensions import db
+
+    user = User(username='signer', email='signer@example.com')
+    user.set_password('Password1')
+    user.password_changed_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.add(user)
+    db.session.commit()
+
+    token = user.generate_access_token()
+    assert jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])['user_id'] == user.id
+    assert User.verify_token(token) is user
+
+    forged = jwt.encode(
+        {'user_id': user.id, 'type': 'access', 'exp': datetime.utcnow() + timedelta(hours=1)},
+        app.config['SECRET_KEY'],
+        algorithm='HS256',
+    )
+    assert User.verify_token(forged) is None
+
+
+def test_tokens_missing_required_claims_are_rejected(app):
+    from datetime import datetime, timedelta
+
+    import jwt
+    from auth.models import User
+    from extensions import db
+
+    user = User(username='claims', email='claims@example.com')
+    user.set_password('Password1')
+    user.password_changed_at = datetime.utcnow() - timedelta(minutes=1)
+    db.session.add(user)
+    db.session.commit()
+
+    # Correctly signed, but without an expiry
+    no_exp = jwt.encode(
+        {'user_id': user.id, 'type': 'access', 'iat': datetime.utcnow()},
+        app.config['JWT_SECRET_KEY'],
+        algorithm='HS256',
+    )
+    assert User.verify_token(no_exp) is None
+
+
+def test_werkzeug_hashes_are_upgraded_to_argon2_on_login(app):
+    from werkzeug.security import generate_password_hash
+
+    from auth.models import User
+
+    user = User(username='legacy', email='legacy@example.com',
+                password_hash=generate_password_hash('Password1', method='pbkdf2:sha256'))
+    assert not user.check_password('wrong')
+    assert user.password_hash.startswith('pbkdf2:')
+    assert user.check_password('Password1')
+    assert user.password_hash.startswith('$argon2')
+    assert user.check_password('Password1')
+
+
+def test_register_rejects_taken_username_and_email(client):
+    payload = {'username': 'newuser', 'email': 'new@example.com', 'password': 'Password1',
+               'first_name': 'New', 'last_name': 'User'}
+    assert client.post('/auth/register', json=payload).status_code == 201
+
+    response = client.post('/auth/register', json=dict(payload, email='other@example.com'))
+    assert (response.status_code, response.get_json()['error']) == (409, 'Username already exists')
+    response = client.post('/auth/register', json=dict(payload, username='otheruser'))
+    assert (response.status_code, response.get_json()['error']) == (409, 'Email already registered')
+
+
+def test_auth_disabled_toggle_is_read_per_request(app, client):
+    assert client.get('/api/students/').status_code == 401
+
+    app.config['AUTH_DISABLED'] = True
+    assert client.get('/api/students/').status_code == 200
+    # Permission-gated views are bypassed too
+    response = client.post('/api/students/', json={'first_name': 'Ada', 'last_name': 'Test'})
+    assert response.status_code == 201
+
+    # The fixture's app context (and so g) outlives each request here
+    from flask import g
+    g.pop('current_user', None)
+    app.config['AUTH_DISABLED'] = False
+    assert client.get('/api/students/').status_code == 401
@@ -2,3 +2,76 @@ def test_calendar_returns_empty_list(client, auth_header):
     response = client.get('/api/calendar/events', headers=auth_header)
     assert response.status_code == 200
     assert response.get_json() == []
+
+
+def test_calendar_events_query_count_is_constant(app, client, auth_header, sql_statements):
+    from datetime import date, time
+
+    from extensions import db
+    from models import Session, Student
+
+    for name in ('Ada', 'Grace', 'Alan'):
+        student = Student(first_name=name, last_name='Test')
+        student.sessions.append(Session(session_date=date.today(),
+                                        start_time=time(9, 0), end_time=time(9, 30)))
+        db.session.add(student)
+    db.session.commit()
+    db.session.expire_all()
+    sql_statements.clear()
+
+    response = client.get('/api/calendar/events', headers=auth_header)
+    assert response.status_code == 200
+    assert sorted(event['title'] for event in response.get_json()) == ['Ada Test', 'Alan Test', 'Grace Test']
+    # Sessions and student names come back from one joined SELECT
+    assert len(sql_statements) == 1
+
+
+def test_bulk_sessions_insert_in_one_batch(app, client, auth_header, sql_statements):
+    from datetime import date, time
+
+    from extensions import db
+    from models import Session, Student
+
+    students = [Student(first_name=name, last_name='Test') for name in ('Ada', 'Grace', 'Alan')]
+    db.session.add_all(students)
+    db.session.flush()
+    db.session.add(Session(student_id=students[1].id, session_date=date(2025, 1, 6),
+                           start_time=time(13, 0), end_time=time(13, 30)))
+    db.session.commit()
+    sql_statements.clear()
+
+    response = client.post('/api/calendar/bulk-sessions', headers=auth_header,
+                           json={'session_date': '2025-01-06', 'duration_minutes': 45})
+    assert response.status_code == 201
+    events = response.get_json()['sessions']
+    assert [(e['title'], e['start'], e['end']) for e in events] == [
+        ('Ada Test', '2025-01-06T09:00:00', '2025-01-06T09:45:00'),
+        ('Alan Test', '2025-01-06T09:45:00', '2025-01-06T10:30:00'),
+    ]
+    assert sum(s.lstrip().upper().startswith('INSERT') for s in sql_statements) == 1
+    assert Session.query.count() == 3
+
+
+def test_create_event_makes_no_reads_after_insert(app, client, auth_header, sql_statements):
+    from extensions import db
+    from models import Student
+
+    student = Student(first_name='Ada', last_name='Test')
+    db.session.add(student)
+    db.session.commit()
+    student_id = student.id
+    db.session.expire_all()
+    sql_statements.clear()
+
+    payload = {'student_id': student_id, 'session_date': '2025-01-06',
+               'start_time': '09:00', 'end_time': '09:30'}
+    response = client.post('/api/calendar/events', json=payload, headers=auth_header)
+    assert response.status_code == 201
+    assert response.get_json()['event']['title'] == 'Ada Test'
+    # Student lookup, conflict check, INSERT
+    assert len(sql_statements) == 3
+    assert sql_statements[-1].startswith('INSERT INTO sessions')
+
+    response = client.post('/api/calendar/events', json=dict(payload, student_id=999),
+                           headers=auth_header)
+    assert response.status_code == 404
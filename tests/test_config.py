@@ -0,0 +1,22 @@
+def test_production_reads_settings_from_env_file(monkeypatch, tmp_path):
+    import app as app_module
+
+    env_file = {
+        'SECRET_KEY': 's' * 32,
+        'SECURITY_PASSWORD_SALT': 'salt',
+        'JWT_SECRET_KEY': 'j' * 32,
+        'DATABASE_URL': f'sqlite:///{tmp_path}/production.db',
+    }
+    for key in env_file:
+        # setenv first so monkeypatch removes whatever load_env_file sets
+        monkeypatch.setenv(key, 'unset')
+        monkeypatch.delenv(key)
+    monkeypatch.setattr(app_module, '_env_file_values', lambda: env_file)
+
+    # config.settings was imported long before .env is read, as in app.py
+    app_module.load_env_file()
+    app = app_module.create_app('production')
+
+    for key in ('SECRET_KEY', 'SECURITY_PASSWORD_SALT', 'JWT_SECRET_KEY'):
+        assert app.config[key] == env_file[key]
+    assert app.config['SQLALCHEMY_DATABASE_URI'] == env_file['DATABASE_URL']
@@ -5,3 +5,42 @@ def test_health_endpoint(client):
     assert callable(create_app)
     response = client.get('/health')
     assert response.status_code == 200
+
+
+def test_json_responses_match_stdlib_provider(app):
+    from datetime import date
+    from decimal import Decimal
+
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {'b': [1, 2.5, None], 'a': date(2025, 1, 6).isoformat(), 'c': Decimal('1.5')}
+    expected = DefaultJSONProvider(app).response(payload).get_data()
+    assert app.json.response(payload).get_data() == expected
+    assert app.json.loads(app.json.dumps(payload)) == {'a': '2025-01-06', 'b': [1, 2.5, None], 'c': '1.5'}
+
+
+def test_api_health_reuses_recent_database_probe(app, client, sql_statements):
+    for _ in range(3):
+        response = client.get('/api/health')
+        assert response.status_code == 200
+        assert response.get_json()['database'] == 'ok'
+    assert sql_statements.count('SELECT 1') == 1
+
+
+def test_dashboard_counts_in_one_query(app, client, sql_statements):
+    from extensions import db
+    from models import Goal, Student
+
+    active = Student(first_name='Ada', last_name='Test')
+    inactive = Student(first_name='Alan', last_name='Test', active=False)
+    active.goals.append(Goal(description='Fluency'))
+    active.goals.append(Goal(description='Old', active=False))
+    db.session.add_all([active, inactive])
+    db.session.commit()
+    sql_statements.clear()
+
+    response = client.get('/api/analytics/dashboard')
+    assert response.status_code == 200
+    stats = response.get_json()['stats']
+    assert (stats['total_students'], stats['total_goals']) == (1, 1)
+    assert len(sql_statements) == 1
@@ -0,0 +1,332 @@
+from datetime import date, time
+
+from sqlalchemy.orm import raiseload
+
+from extensions import db
+from models import Student, Goal, Objective, Session, TrialLog, SOAPNote
+
+
+def _student(**kwargs):
+    student = Student(first_name='Ada', last_name='Lovelace', grade_level='Grade 10', **kwargs)
+    db.session.add(student)
+    db.session.commit()
+    return student
+
+
+def test_student_and_goal_to_dict(app):
+    student = _student()
+    goal = Goal(student=student, description='Articulate /r/', target_date=date(2025, 6, 1))
+    goal.objectives.append(Objective(description='Initial /r/', current_progress=40.0))
+    goal.objectives.append(Objective(description='Medial /r/', current_progress=60.0))
+    db.session.add(goal)
+    db.session.commit()
+
+    data = student.to_dict()
+    assert data['goals_count'] == 1
+    assert data['display_name'] == 'Ada Lovelace'
+    assert data['first_name'] == 'Ada'
+    assert data['created_at'] == student.created_at.isoformat()
+
+    goal_data = goal.to_dict()
+    assert goal_data['target_date'] == '2025-06-01'
+    assert goal_data['progress_percentage'] == 50.0
+    assert goal_data['objectives_count'] == 2
+    assert goal_data['last_reviewed'] is None
+
+    objective = goal.objectives[0].to_dict()
+    assert objective['current_progress'] == 40.0
+    assert objective['trial_logs_count'] == 0
+
+
+def test_anonymized_student_hides_names(app):
+    student = _student()
+    student.anonymize()
+    data = student.to_dict()
+    assert 'first_name' not in data
+    assert data['display_name'] == f'Student {student.anonymous_id[:8]}'
+
+
+def test_session_serializers(app):
+    student = _student()
+    session = Session(student_id=student.id, session_date=date(2025, 1, 6),
+                      start_time=time(9, 0), end_time=time(9, 45), location='Room 1')
+    db.session.add(session)
+    db.session.commit()
+
+    data = session.to_dict()
+    assert data['session_date'] == '2025-01-06'
+    assert data['start_time'] == '09:00'
+    assert data['end_time'] == '09:45'
+    assert data['duration_minutes'] == 45
+    assert data['location'] == 'Room 1'
+
+    event = session.to_calendar_event()
+    assert event['title'] == 'Ada Lovelace'
+    assert event['start'] == '2025-01-06T09:00:00'
+    assert event['end'] == '2025-01-06T09:45:00'
+
+
+def test_trial_log_percentages(app):
+    student = _student()
+    log = TrialLog(student_id=student.id, session_date=date(2025, 1, 6),
+                   independent=6, minimal_support=2, moderate_support=0,
+                   maximal_support=0, incorrect=2)
+    db.session.add(log)
+    db.session.commit()
+
+    data = log.to_dict()
+    assert data['total_trials'] == 10
+    assert data['independence_percentage'] == 60.0
+    assert data['success_percentage'] == 80.0
+    assert data['support_levels']['minimal_support'] == 2
+
+
+def test_trial_log_writes_refresh_objective_progress(app):
+    from datetime import timedelta
+
+    student = _student()
+    goal = Goal(student=student, description='Articulate /r/')
+    objective = Objective(description='Initial /r/', current_progress=10.0)
+    goal.objectives.append(objective)
+    db.session.add(goal)
+    db.session.commit()
+
+    today = date.today()
+    old = TrialLog(student=student, objective=objective, session_date=today - timedelta(days=60),
+                   independent=1, incorrect=9)
+    log = TrialLog(student=student, objective=objective, session_date=today,
+                   independent=6, incorrect=4)
+    db.session.add_all([old, log])
+    db.session.commit()
+    # Only the log inside the 30-day window counts
+    assert objective.recent_progress == 60.0
+    assert objective.to_dict()['current_progress'] == 60.0
+
+    TrialLog.bulk_create([{'student_id': student.id, 'objective_id': objective.id,
+                           'session_date': today, 'correct_no_support': 9, 'incorrect_legacy': 1}])
+    db.session.commit()
+    assert objective.recent_progress == 75.0
+
+    log.objective = None
+    db.session.commit()
+    assert objective.recent_progress == 90.0
+    # The entered value is never overwritten
+    assert objective.current_progress == 10.0
+
+
+def test_objective_progress_falls_back_when_last_recent_log_leaves(app):
+    student = _student()
+    goal = Goal(student=student, description='Articulate /r/')
+    first = Objective(description='Initial /r/', current_progress=10.0)
+    second = Objective(description='Medial /r/', current_progress=20.0)
+    goal.objectives.extend([first, second])
+    db.session.add(goal)
+    db.session.commit()
+
+    log = TrialLog(student=student, objective=first, session_date=date.today(), independent=10)
+    db.session.add(log)
+    db.session.commit()
+    assert first.to_dict()['current_progress'] == 100.0
+
+    db.session.delete(log)
+    db.session.commit()
+    assert first.recent_progress is None
+    assert first.to_dict()['current_progress'] == 10.0
+
+    log = TrialLog(student=student, objective=first, session_date=date.today(), independent=10)
+    db.session.add(log)
+    db.session.commit()
+    log.objective_id = second.id
+    db.session.commit()
+    assert first.to_dict()['current_progress'] == 10.0
+    assert second.to_dict()['current_progress'] == 100.0
+    assert Goal.bulk_progress([goal.id])[goal.id] == (55.0, 2)
+
+
+def test_soap_note_to_dict(app):
+    student = _student()
+    note = SOAPNote(student_id=student.id, session_date=date(2025, 1, 6),
+                    subjective='Alert', plan='Continue')
+    db.session.add(note)
+    db.session.commit()
+
+    data = note.to_dict()
+    assert data['session_date'] == '2025-01-06'
+    assert data['reviewed_date'] is None
+    assert data['subjective'] == 'Alert'
+    assert 'subjective' not in note.to_dict(include_content=False)
+
+
+def test_list_queries_eager_load_to_dict_relationships(app):
+    for name in ('Ada', 'Grace'):
+        student = Student(first_name=name, last_name='Test')
+        goal = Goal(student=student, description='Fluency')
+        goal.objectives.append(Objective(description='Slow rate'))
+        db.session.add(student)
+    db.session.commit()
+    db.session.expire_all()
+
+    # raiseload fails on any relationship the helper did not load up front
+    students = Student.query_with_goal_counts().options(raiseload('*')).all()
+    assert [s.to_dict()['goals_count'] for s in students] == [1, 1]
+
+    db.session.expire_all()
+    goals = Goal.query_with_objectives().options(raiseload('*')).all()
+    assert [g.to_dict()['objectives_count'] for g in goals] == [1, 1]
+
+
+def test_goal_bulk_progress_matches_to_dict(app):
+    student = _student()
+    goals = [Goal(student=student, description=f'Goal {n}') for n in range(3)]
+    goals[0].objectives.append(Objective(description='A', current_progress=40.0))
+    goals[0].objectives.append(Objective(description='B', current_progress=None))
+    goals[0].objectives.append(Objective(description='C', current_progress=90.0, active=False))
+    goals[1].objectives.append(Objective(description='D', current_progress=70.0, active=False))
+    db.session.add_all(goals)
+    db.session.commit()
+
+    progress = Goal.bulk_progress([goal.id for goal in goals])
+    assert progress[goals[0].id] == (20.0, 3)
+    assert [goal.to_dict(progress_map=progress) for goal in goals] == [goal.to_dict() for goal in goals]
+
+
+def test_display_name_is_queryable(app):
+    _student()
+    hidden = _student()
+    hidden.anonymize()
+    db.session.commit()
+
+    names = db.session.scalars(db.select(Student.display_name).order_by(Student.id)).all()
+    assert names == ['Ada Lovelace', hidden.display_name]
+    assert Student.query.filter(Student.display_name == 'Ada Lovelace').count() == 1
+
+
+def test_restore_trial_logs_bulk_inserts_new_rows(app, tmp_path):
+    from utils.backup import DatabaseBackup
+
+    student = _student()
+    db.session.add(TrialLog(id=1, student=student, session_date=date(2025, 1, 6), independent=9))
+    db.session.commit()
+
+    logs = [
+        {'id': log_id, 'student_id': student.id, 'session_date': '2025-01-06', 'independent': log_id}
+        for log_id in (1, 2, 3)
+    ]
+    assert DatabaseBackup(str(tmp_path))._restore_trial_logs(logs, 'skip') == 2
+    db.session.commit()
+
+    restored = TrialLog.query.order_by(TrialLog.id).all()
+    assert [log.independent for log in restored] == [9, 2, 3]
+    assert all(log.created_at is not None for log in restored)
+
+
+def test_calendar_query_eager_loads_students(app):
+    for name in ('Ada', 'Grace'):
+        student = Student(first_name=name, last_name='Test')
+        student.sessions.append(Session(session_date=date(2025, 1, 6),
+                                        start_time=time(9, 0), end_time=time(9, 30)))
+        db.session.add(student)
+    db.session.commit()
+    db.session.expire_all()
+
+    sessions = Session.query_with_student().options(raiseload('*')).order_by(Session.id).all()
+    assert [s.to_calendar_event()['title'] for s in sessions] == ['Ada Test', 'Grace Test']
+
+
+def test_calendar_rows_match_to_calendar_event(app):
+    student = _student()
+    student.sessions.append(Session(session_date=date(2025, 1, 6), start_time=time(9, 0),
+                                    end_time=time(9, 30), location='Room 4'))
+    db.session.add(Session(student_id=student.id, session_date=date(2025, 1, 7),
+                           start_time=time(10, 0), end_time=time(10, 30)))
+    db.session.commit()
+
+    rows = db.session.execute(Session.calendar_select().order_by(Session.id))
+    sessions = Session.query.order_by(Session.id).all()
+    assert Session.calendar_events_from_rows(rows) == [s.to_calendar_event() for s in sessions]
+
+
+def test_student_list_rows_match_to_dict(app):
+    student = _student(preferred_name='Ada L')
+    student.goals.append(Goal(description='Fluency'))
+    hidden = Student(first_name='Grace', last_name='Hopper')
+    db.session.add(hidden)
+    db.session.commit()
+    hidden.anonymize()
+    db.session.commit()
+
+    rows = db.session.execute(Student.list_select().order_by(Student.id))
+    students = Student.query.order_by(Student.id).all()
+    assert Student.dicts_from_rows(rows) == [s.to_dict() for s in students]
+
+
+def test_duration_minutes_filters_in_sql(app):
+    student = _student()
+    for start, end in ((time(9, 0), time(9, 45)), (time(10, 0), time(10, 20)), (time(11, 0), time(10, 30))):
+        student.sessions.append(Session(session_date=date(2025, 1, 6), start_time=start, end_time=end))
+    db.session.commit()
+
+    long_sessions = Session.query.filter(Session.duration_minutes >= 30).all()
+    assert [s.duration_minutes for s in long_sessions] == [45]
+    in_sql = db.session.scalars(db.select(Session.duration_minutes).order_by(Session.id)).all()
+    assert in_sql == [s.duration_minutes for s in Session.query.order_by(Session.id)] == [45, 20, -30]
+
+
+def test_bulk_anonymize_matches_anonymize(app):
+    from utils.privacy import PrivacyManager
+
+    student = _student()
+    other = _student(preferred_name='Other')
+    notes = [
+        SOAPNote(student=student, session_date=date(2025, 1, 6), subjective='Said hi', plan='',
+                 clinician_signature='SLP'),
+        SOAPNote(student=student, session_date=date(2025, 1, 7), objective='8/10', anonymized=True),
+        SOAPNote(student=other, session_date=date(2025, 1, 6), subjective='Untouched'),
+        # Restores can leave the flag NULL
+        SOAPNote(student=student, session_date=date(2025, 1, 8), subjective='Restored',
+                 anonymized=None),
+    ]
+    db.session.add_all(notes)
+    db.session.commit()
+
+    result = PrivacyManager.anonymize_student(student.id)
+    assert result['report']['records_affected']['soap_notes'] == 2
+
+    first, already, untouched, restored = notes
+    assert (restored.anonymized, restored.subjective) == (True, 'ANONYMIZED CONTENT')
+    assert (first.anonymized, first.subjective, first.plan, first.objective) == (True, 'ANONYMIZED CONTENT', '', None)
+    assert first.clinician_signature == 'ANONYMIZED'
+    assert already.objective == '8/10'
+    assert (untouched.anonymized, untouched.subjective) == (False, 'Untouched')
+
+
+def test_soap_note_parents_must_be_loaded_explicitly(app):
+    import pytest
+    from sqlalchemy.exc import InvalidRequestError
+    from sqlalchemy.orm import selectinload
+
+    db.session.add(SOAPNote(student=_student(), session_date=date(2025, 1, 6)))
+    db.session.commit()
+    db.session.expunge_all()
+
+    with pytest.raises(InvalidRequestError):
+        SOAPNote.query.one().student
+    db.session.expunge_all()
+    note = SOAPNote.query.options(selectinload(SOAPNote.student)).one()
+    assert note.student.first_name == 'Ada'
+
+
+def test_updated_at_is_set_by_the_database(app, sql_statements):
+    student = _student()
+    goal = Goal(student=student, description='Fluency')
+    db.session.add(goal)
+    db.session.commit()
+    assert goal.updated_at is None
+
+    sql_statements.clear()
+    goal.description = 'Fluency in conversation'
+    db.session.commit()
+    update = next(s for s in sql_statements if s.startswith('UPDATE goals'))
+    # Rendered inline rather than bound from a Python-side datetime
+    assert 'CURRENT_TIMESTAMP' in update
+    assert goal.updated_at is not None
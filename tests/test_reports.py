@@ -0,0 +1,79 @@
+import json
+from datetime import date
+
+import pytest
+
+from extensions import db
+from auth.models import User
+from models import Student, TrialLog
+import routes.reports
+
+
+@pytest.fixture
+def admin_header(app, monkeypatch):
+    admin = User(username='admin', email='admin@example.com', role='admin')
+    admin.set_password('Password1')
+    db.session.add(admin)
+    db.session.commit()
+    monkeypatch.setattr(User, 'verify_token', staticmethod(lambda _token: admin))
+    return {'Authorization': 'Bearer admin-token'}
+
+
+def test_trial_log_export_streams_all_rows(app, client, admin_header, monkeypatch):
+    monkeypatch.setattr(routes.reports, 'EXPORT_BATCH_SIZE', 2)
+    student = Student(first_name='Ada', last_name='Lovelace')
+    for independent in range(5):
+        student.trial_logs.append(TrialLog(session_date=date.today(), independent=independent))
+    db.session.add(student)
+    db.session.commit()
+
+    response = client.get('/api/reports/export/trial_logs', headers=admin_header)
+    assert response.status_code == 200
+    assert response.is_streamed
+    body = json.loads(response.get_data())
+    assert body['report_type'] == 'trial_logs'
+    assert [log['total_trials'] for log in body['data']] == [0, 1, 2, 3, 4]
+
+
+def test_empty_export_is_valid_json(client, admin_header):
+    response = client.get('/api/reports/export/sessions', headers=admin_header)
+    assert json.loads(response.get_data())['data'] == []
+
+
+def test_export_failure_mid_stream_is_logged(app, client, admin_header, monkeypatch, caplog):
+    student = Student(first_name='Ada', last_name='Lovelace')
+    student.trial_logs.append(TrialLog(session_date=date.today(), independent=1))
+    db.session.add(student)
+    db.session.commit()
+
+    def broken_to_dict(self):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(TrialLog, 'to_dict', broken_to_dict)
+    response = client.get('/api/reports/export/trial_logs', headers=admin_header)
+    assert response.status_code == 200
+    with pytest.raises(RuntimeError):
+        response.get_data()
+    assert 'Export of trial_logs failed mid-stream' in caplog.text
+
+
+def test_progress_report_counts_soap_notes_without_loading_text(app, client, admin_header,
+                                                                  sql_statements):
+    from models import Goal, Objective, SOAPNote
+
+    student = Student(first_name='Ada', last_name='Lovelace')
+    goal = Goal(student=student, description='Fluency', completion_criteria='x' * 500)
+    goal.objectives.append(Objective(description='Slow rate', notes='y' * 500))
+    student.soap_notes.append(SOAPNote(session_date=date.today(), subjective='Doing well'))
+    db.session.add_all([student, goal])
+    db.session.commit()
+    sql_statements.clear()
+
+    response = client.get(f'/api/reports/student/{student.id}/progress', headers=admin_header)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['total_soap_notes'] == 1
+    assert body['goals_progress'][0]['description'] == 'Fluency'
+    selected = ' '.join(sql_statements)
+    for column in ('soap_notes.subjective', 'goals.completion_criteria', 'objectives.notes'):
+        assert column not in selected
@@ -0,0 +1,196 @@
+def _walk_pages(client, url, key, headers, **params):
+    """Follow next_cursor from the first page to the last and return every item."""
+    items, cursor = [], None
+    while True:
+        query = {**params, **({'cursor': cursor} if cursor else {})}
+        body = client.get(url, query_string=query, headers=headers).get_json()
+        items += body[key]
+        cursor = body['next_cursor']
+        if cursor is None:
+            return items
+
+
+def test_student_list_query_count_is_constant(app, client, auth_header, sql_statements):
+    from extensions import db
+    from models import Goal, Student
+
+    for name in ('Ada', 'Grace', 'Alan'):
+        student = Student(first_name=name, last_name='Test')
+        student.goals.append(Goal(description=f'{name} goal'))
+        student.goals.append(Goal(description=f'{name} old goal', active=False))
+        db.session.add(student)
+    db.session.commit()
+    db.session.expire_all()
+    sql_statements.clear()
+
+    response = client.get('/api/students/', headers=auth_header)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [s['goals_count'] for s in body['students']] == [1, 1, 1]
+    assert body['next_cursor'] is None
+    # One page of students with goals_count computed in SQL, and no COUNT
+    assert len(sql_statements) == 1
+
+
+def test_student_list_pages_by_cursor(app, client, auth_header):
+    from extensions import db
+    from models import Student
+
+    names = ['Hopper', 'Lovelace', 'Turing', 'Babbage', 'Lovelace']
+    db.session.add_all(Student(first_name='Test', last_name=name) for name in names)
+    db.session.commit()
+
+    students = _walk_pages(client, '/api/students/', 'students', auth_header, per_page=2)
+    seen = [(s['last_name'], s['id']) for s in students]
+    assert seen == sorted(seen)
+    assert [name for name, _ in seen] == sorted(names)
+
+    body = client.get('/api/students/', query_string={'per_page': 2, 'include_total': 'true'},
+                      headers=auth_header).get_json()
+    assert body['total'] == 5
+
+    # Offset pages are still served for clients that ask for them
+    body = client.get('/api/students/', query_string={'page': 3, 'per_page': 2},
+                      headers=auth_header).get_json()
+    assert [s['last_name'] for s in body['students']] == ['Turing']
+    assert (body['total'], body['page'], body['pages']) == (5, 3, 3)
+
+    response = client.get('/api/students/', query_string={'cursor': 'not-a-cursor'},
+                          headers=auth_header)
+    assert response.status_code == 400
+
+
+def test_bulk_create_students_in_one_insert(app, client, auth_header, sql_statements):
+    from models import Student
+
+    payload = [
+        {'first_name': 'Ada', 'last_name': 'Test', 'grade_level': 'Grade 9'},
+        {'first_name': 'Grace', 'last_name': 'Test', 'nickname': 'ignored'},
+    ]
+    response = client.post('/api/students/bulk', json=payload, headers=auth_header)
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 2
+    assert len([s for s in sql_statements if s.startswith('INSERT INTO students')]) == 1
+
+    students = Student.query.order_by(Student.id).all()
+    assert [s.first_name for s in students] == ['Ada', 'Grace']
+    assert all(s.active and len(s.anonymous_id) == 32 for s in students)
+    assert students[0].anonymous_id != students[1].anonymous_id
+
+
+def test_bulk_create_students_rejects_invalid_rows(app, client, auth_header):
+    from models import Student
+
+    payload = [{'first_name': 'Ada', 'last_name': 'Test'}, {'first_name': 'Grace'}]
+    response = client.post('/api/students/bulk', json=payload, headers=auth_header)
+    assert response.status_code == 400
+    assert list(response.get_json()['messages']) == ['1']
+    assert Student.query.count() == 0
+
+
+def test_bulk_update_students_in_one_statement(app, client, auth_header, sql_statements):
+    from extensions import db
+    from models import Student
+
+    students = [Student(first_name=name, last_name='Test') for name in ('Ada', 'Grace')]
+    db.session.add_all(students)
+    db.session.commit()
+    ids = [s.id for s in students]
+    sql_statements.clear()
+
+    payload = [{'id': ids[0], 'grade_level': 'Grade 11'}, {'id': ids[1], 'grade_level': 'Grade 12'}]
+    response = client.put('/api/students/bulk', json=payload, headers=auth_header)
+    assert response.status_code == 200
+    assert response.get_json() == {'updated': 2}
+    assert len([s for s in sql_statements if s.startswith('UPDATE students')]) == 1
+
+    db.session.expire_all()
+    assert [db.session.get(Student, i).grade_level for i in ids] == ['Grade 11', 'Grade 12']
+
+    response = client.put('/api/students/bulk', json=[{'id': 999, 'grade_level': 'Grade 9'}],
+                          headers=auth_header)
+    assert response.status_code == 404
+
+
+def test_bulk_update_students_rejects_unwritable_fields(app, client, auth_header):
+    from extensions import db
+    from models import Student
+
+    students = [Student(first_name=name, last_name='Test') for name in ('Ada', 'Grace')]
+    db.session.add_all(students)
+    db.session.commit()
+    ids = [s.id for s in students]
+
+    # active is writable here, as it is through PUT /<id>; id-only rows are not counted
+    payload = [{'id': ids[0], 'first_name': 'Z', 'active': False}, {'id': ids[1]}]
+    response = client.put('/api/students/bulk', json=payload, headers=auth_header)
+    assert response.get_json() == {'updated': 1}
+    db.session.expire_all()
+    ada, grace = (db.session.get(Student, i) for i in ids)
+    assert (ada.first_name, ada.active) == ('Z', False)
+    assert (grace.first_name, grace.active) == ('Grace', True)
+
+    payload = [{'id': ids[1], 'first_name': 'Y', 'anonymous_id': 'x', 'dob': '2010-01-02'}]
+    response = client.put('/api/students/bulk', json=payload, headers=auth_header)
+    assert response.status_code == 400
+    assert response.get_json()['fields'] == ['anonymous_id', 'dob']
+    db.session.expire_all()
+    assert db.session.get(Student, ids[1]).first_name == 'Grace'
+
+    response = client.put('/api/students/bulk', json=[{'id': ids[1], 'active': 'maybe'}],
+                          headers=auth_header)
+    assert response.status_code == 400
+
+
+def test_get_student_is_one_select(app, client, auth_header, sql_statements):
+    from extensions import db
+    from models import Goal, Student
+
+    student = Student(first_name='Ada', last_name='Test')
+    student.goals.append(Goal(description='Fluency'))
+    db.session.add(student)
+    db.session.commit()
+    student_id = student.id
+    db.session.expire_all()
+    sql_statements.clear()
+
+    response = client.get(f'/api/students/{student_id}', headers=auth_header)
+    assert response.status_code == 200
+    assert response.get_json()['goals_count'] == 1
+    assert len(sql_statements) == 1
+
+    assert client.get('/api/students/999', headers=auth_header).status_code == 404
+
+
+def test_trial_logs_page_by_cursor_within_default_window(app, client, auth_header):
+    from datetime import date, timedelta
+    from extensions import db
+    from models import Student, TrialLog
+
+    student = Student(first_name='Ada', last_name='Test')
+    db.session.add(student)
+    db.session.commit()
+    today = date.today()
+    # Two logs share a date so the id tiebreak is exercised; the last is too old
+    days = [0, 3, 3, 10, 400]
+    db.session.add_all(TrialLog(student_id=student.id, session_date=today - timedelta(days=d),
+                                independent=1) for d in days)
+    db.session.commit()
+
+    url = f'/api/students/{student.id}/trial-logs'
+    logs = _walk_pages(client, url, 'trial_logs', auth_header, per_page=2)
+    seen = [(log['session_date'], log['id']) for log in logs]
+    assert seen == sorted(seen, reverse=True)
+    assert len(seen) == 4
+
+    old = (today - timedelta(days=500)).isoformat()
+    body = client.get(url, query_string={'start_date': old}, headers=auth_header).get_json()
+    assert len(body['trial_logs']) == 5
+
+    for query in ({'cursor': 'not-a-cursor'}, {'start_date': '2025-13-01'},
+                  {'end_date': 'yesterday'}):
+        response = client.get(url, query_string=query, headers=auth_header)
+        assert response.status_code == 400, query
+
+    response = client.get('/api/students/999/trial-logs', headers=auth_header)
+    assert response.status_code == 404
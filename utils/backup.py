@@ -24,6 +24,9 @@ class DatabaseBackup:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             backup_name = f"full_backup_{timestamp}"
             
+            goals = Goal.query.all()
+            goal_progress = Goal.bulk_progress([goal.id for goal in goals])
+            
             backup_data = {
                 'metadata': {
                     'backup_type': 'full',
@@ -33,8 +36,8 @@ class DatabaseBackup:
                 },
                 'data': {
                     'users': [user.to_dict() for user in User.query.all()],
-                    'students': [student.to_dict() for student in Student.query.all()],
-                    'goals': [goal.to_dict() for goal in Goal.query.all()],
+                    'students': [student.to_dict() for student in Student.query_with_goal_counts().all()],
+                    'goals': [goal.to_dict(progress_map=goal_progress) for goal in goals],
                     'objectives': [obj.to_dict() for obj in Objective.query.all()],
                     'sessions': [session.to_dict() for session in Session.query.all()],
                     'soap_notes': [note.to_dict(include_content=True) for note in SOAPNote.query.all()]
@@ -84,8 +87,9 @@ class DatabaseBackup:
             backup_name = f"incremental_backup_{since_date.strftime('%Y%m%d')}_{timestamp}"
             
             # Get records modified since date
-            modified_students = Student.query.filter(Student.updated_at >= since_date).all()
+            modified_students = Student.query_with_goal_counts().filter(Student.updated_at >= since_date).all()
             modified_goals = Goal.query.filter(Goal.updated_at >= since_date).all()
+            goal_progress = Goal.bulk_progress([goal.id for goal in modified_goals])
             modified_objectives = Objective.query.filter(Objective.updated_at >= since_date).all()
             modified_sessions = Session.query.filter(Session.updated_at >= since_date).all()
             modified_trial_logs = TrialLog.query.filter(TrialLog.updated_at >= since_date).all()
@@ -107,7 +111,7 @@ class DatabaseBackup:
                 },
                 'data': {
                     'students': [student.to_dict() for student in modified_students],
-                    'goals': [goal.to_dict() for goal in modified_goals],
+                    'goals': [goal.to_dict(progress_map=goal_progress) for goal in modified_goals],
                     'objectives': [obj.to_dict() for obj in modified_objectives],
                     'sessions': [session.to_dict() for session in modified_sessions],
                     'trial_logs': [log.to_dict() for log in modified_trial_logs],
@@ -502,29 +506,37 @@ class DatabaseBackup:
 
     def _restore_trial_logs(self, trial_logs_data: List[Dict], mode: str) -> int:
         """Restore trial logs data."""
-        count = 0
-        for log_data in trial_logs_data:
-            if mode == 'skip' and TrialLog.query.get(log_data['id']):
-                continue
-            
-            trial_log = TrialLog(
-                id=log_data['id'],
-                student_id=log_data['student_id'],
-                objective_id=log_data.get('objective_id'),
-                session_date=datetime.fromisoformat(log_data['session_date']).date(),
-                independent=log_data.get('independent', 0),
-                minimal_support=log_data.get('minimal_support', 0),
-                moderate_support=log_data.get('moderate_support', 0),
-                maximal_support=log_data.get('maximal_support', 0),
-                incorrect=log_data.get('incorrect', 0),
-                session_notes=log_data.get('session_notes'),
-                environmental_factors=log_data.get('environmental_factors')
-            )
-            
-            db.session.merge(trial_log)
-            count += 1
+        rows = [
+            {
+                'id': log_data['id'],
+                'student_id': log_data['student_id'],
+                'objective_id': log_data.get('objective_id'),
+                'session_date': datetime.fromisoformat(log_data['session_date']).date(),
+                'independent': log_data.get('independent', 0),
+                'minimal_support': log_data.get('minimal_support', 0),
+                'moderate_support': log_data.get('moderate_support', 0),
+                'maximal_support': log_data.get('maximal_support', 0),
+                'incorrect': log_data.get('incorrect', 0),
+                'session_notes': log_data.get('session_notes'),
+                'environmental_factors': log_data.get('environmental_factors')
+            }
+            for log_data in trial_logs_data
+        ]
         
-        return count
+        if mode == 'skip':
+            # One query for the incoming ids that already exist instead of a lookup per row
+            existing = set(db.session.scalars(
+                db.select(TrialLog.id).where(TrialLog.id.in_([row['id'] for row in rows]))
+            ))
+            rows = [row for row in rows if row['id'] not in existing]
+        
+        if mode in ('replace', 'skip'):
+            # Every remaining row is new, so insert them in one batch
+            return TrialLog.bulk_create(rows)
+        
+        for row in rows:
+            db.session.merge(TrialLog(**row))
+        return len(rows)
 
     def _restore_soap_notes(self, soap_notes_data: List[Dict], mode: str) -> int:
         """Restore SOAP notes data."""
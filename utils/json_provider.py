@@ -0,0 +1,43 @@
+"""Flask JSON provider backed by orjson when it is installed."""
+
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional; create_app falls back to Flask's stdlib provider
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize and parse JSON with orjson.
+
+    Keeps Flask's behaviour for sorted keys and debug indentation, and
+    falls back to ``DefaultJSONProvider.default`` for types orjson does
+    not handle natively (``Decimal``, objects with ``__html__``...).
+    ``datetime``/``date``/``time`` values are emitted as ISO 8601.
+    """
+
+    def _dumpb(self, obj, sort_keys=None, indent=False, default=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default or self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumpb(
+            obj, kwargs.get('sort_keys'), bool(kwargs.get('indent')), kwargs.get('default')
+        ).decode()
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of decoding
+        # to str and letting Werkzeug encode them again
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumpb(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
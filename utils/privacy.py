@@ -1,5 +1,5 @@
 import hashlib
-import uuid
+from secrets import token_hex
 import re
 from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional
@@ -33,11 +33,8 @@ class PrivacyManager:
             # Anonymize student record
             student.anonymize()
             
-            # Anonymize related SOAP notes
-            soap_notes = SOAPNote.query.filter_by(student_id=student_id).all()
-            for note in soap_notes:
-                if not note.anonymized:
-                    note.anonymize()
+            # Anonymize related SOAP notes in one UPDATE
+            soap_notes_anonymized = SOAPNote.bulk_anonymize([student_id])
             
             # Generate anonymization report
             report = {
@@ -46,14 +43,14 @@ class PrivacyManager:
                 'anonymized_at': datetime.utcnow().isoformat(),
                 'records_affected': {
                     'student_record': 1,
-                    'soap_notes': len(soap_notes),
+                    'soap_notes': soap_notes_anonymized,
                     'trial_logs_preserved': TrialLog.query.filter_by(student_id=student_id).count()
                 },
                 'analytics_preserved': preserve_analytics
             }
             
             db.session.commit()
-            logger.info(f"Anonymized student {student_id} - {len(soap_notes)} SOAP notes affected")
+            logger.info(f"Anonymized student {student_id} - {soap_notes_anonymized} SOAP notes affected")
             
             return {'status': 'success', 'report': report}
             
@@ -101,7 +98,7 @@ class PrivacyManager:
             return hashlib.md5(seed.encode()).hexdigest()[:8]
         else:
             # Generate random ID
-            return uuid.uuid4().hex[:8]
+            return token_hex(4)
 
     @staticmethod
     def check_retention_policy(retention_days: int = 2555) -> List[Dict]:  # ~7 years default